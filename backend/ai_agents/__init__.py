@@ -1,11 +1,48 @@
 # Extensible AI agents library with LangChain and MCP
 
-from .agents import BaseAgent, SearchAgent, ChatAgent, AgentConfig, AgentResponse
+import importlib
+
+from .config import AgentConfig
+from .cache import ResponseCache, TTLCache, response_cache
+from .registry import AgentRegistry
+from .singleflight import SingleFlight, llm_singleflight
+from .scheduler import LLMScheduler, Priority, QueueFullError, llm_scheduler
+from .instrumentation import add_llm_observer
+
+# The agent classes import LangChain; load them on first access so importing the
+# package (for the cache, scheduler or registry) stays cheap
+_LAZY_ATTRIBUTES = {
+    "BaseAgent": ".agents",
+    "SearchAgent": ".agents",
+    "ChatAgent": ".agents",
+    "AgentResponse": ".agents",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "BaseAgent",
     "SearchAgent", 
     "ChatAgent",
     "AgentConfig",
-    "AgentResponse"
+    "AgentResponse",
+    "AgentRegistry",
+    "LLMScheduler",
+    "Priority",
+    "QueueFullError",
+    "llm_scheduler",
+    "add_llm_observer",
+    "ResponseCache",
+    "SingleFlight",
+    "llm_singleflight",
+    "TTLCache",
+    "response_cache"
 ]
@@ -1,33 +1,20 @@
 # Extensible AI agents with LangChain and MCP support
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Callable
 import os
 import logging
-from dataclasses import dataclass
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from pydantic import BaseModel
 
-logger = logging.getLogger(__name__)
-
+from .config import AgentConfig
+from .cache import ResponseCache, response_cache as shared_response_cache
+from .singleflight import llm_singleflight
+from .scheduler import LLMScheduler, Priority, QueueFullError, llm_scheduler
+from .instrumentation import observe_llm_call
 
-@dataclass
-class AgentConfig:
-    # AI agent configuration
-    api_base_url: str = None
-    model_name: str = None
-    api_key: str = None
-    
-    def __post_init__(self):
-        # Load from env if not provided
-        if self.api_base_url is None:
-            self.api_base_url = os.getenv("LITELLM_BASE_URL", "https://litellm-docker-545630944929.us-central1.run.app")
-        if self.model_name is None:
-            self.model_name = os.getenv("AI_MODEL_NAME", "gemini-2.5-pro")
-        if self.api_key is None:
-            # LITELLM_AUTH_TOKEN for AI API
-            self.api_key = os.getenv("LITELLM_AUTH_TOKEN", "dummy-key")
+logger = logging.getLogger(__name__)
 
 
 class AgentResponse(BaseModel):
@@ -40,16 +27,37 @@ class AgentResponse(BaseModel):
 
 class BaseAgent:
     # Base AI agent with LangChain and MCP support
+
+    # Subclasses whose replies must never be reused can set this to False
+    cacheable: bool = True
+    # Set to False to give every concurrent identical request its own model call
+    coalesce: bool = True
     
-    def __init__(self, config: AgentConfig, system_prompt: str = "You are a helpful AI assistant."):
+    def __init__(
+        self,
+        config: AgentConfig,
+        system_prompt: str = "You are a helpful AI assistant.",
+        response_cache: Optional[ResponseCache] = None,
+        use_cache: Optional[bool] = None,
+        http_async_client=None,
+        scheduler: Optional[LLMScheduler] = None,
+    ):
         self.config = config
         self.system_prompt = system_prompt
+        self.scheduler = scheduler or llm_scheduler
+
+        # Response cache shared across agents by default
+        if use_cache is None:
+            use_cache = self.cacheable and os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.response_cache = (response_cache or shared_response_cache) if use_cache else None
         
         # LangChain ChatOpenAI setup
+        # An httpx.AsyncClient passed in is shared, so connections are pooled across agents
         self.llm = ChatOpenAI(
             base_url=config.api_base_url,
             api_key=config.api_key,
-            model=config.model_name
+            model=config.model_name,
+            http_async_client=http_async_client
         )
         
         # MCP client lazy init
@@ -69,32 +77,57 @@ class BaseAgent:
             logger.error(f"Failed to setup MCP: {e}")
             self.mcp_client = None
     
-    async def execute(self, prompt: str, use_tools: bool = True) -> AgentResponse:
-        # Execute agent with prompt
+    def reserve_slot(self, endpoint: str = "default", priority: int = Priority.DEFAULT):
+        # A scheduler slot or queue place taken up front; QueueFullError when the queue is full
+        return self.scheduler.reserve(self.__class__.__name__, endpoint, priority)
+
+    def release_slot(self, reservation):
+        self.scheduler.release(reservation)
+
+    def tools_active(self, use_tools: bool) -> bool:
+        return bool(use_tools and self.mcp_client and self.mcp_tools)
+
+    async def execute(
+        self,
+        prompt: str,
+        use_tools: bool = True,
+        use_cache: bool = True,
+        endpoint: str = "default",
+        priority: int = Priority.DEFAULT,
+        cache_if: Optional[Callable[[str], bool]] = None,
+    ) -> AgentResponse:
+        # Execute agent with prompt. cache_if lets the caller keep replies it cannot use
+        # (unparseable JSON, no image URL) out of the cache; cached replies it rejects count as misses.
         try:
-            messages = [
-                SystemMessage(content=self.system_prompt),
-                HumanMessage(content=prompt)
-            ]
-            
-            # Use MCP tools if available
-            if use_tools and self.mcp_client and self.mcp_tools:
-                # Agent with tools
-                agent_executor = self.llm.bind_tools(self.mcp_tools)
-                response = await agent_executor.ainvoke(messages)
-            else:
-                # LLM without tools
-                response = await self.llm.ainvoke(messages)
-            
-            return AgentResponse(
-                success=True,
-                content=response.content,
-                metadata={
-                    "model": self.config.model_name,
-                    "tools_used": len(self.mcp_tools) if use_tools else 0
-                }
+            tools_active = self.tools_active(use_tools)
+            request_key = ResponseCache.make_key(self.config.model_name, self.system_prompt, prompt, tools_active)
+
+            # Identical prompts are answered from the response cache; tool calls have side
+            # effects and are never cached
+            cache = self.response_cache if use_cache and not tools_active else None
+            if cache is not None:
+                cached = await cache.get(request_key, accept=cache_if)
+                if cached is not None:
+                    return AgentResponse(
+                        success=True,
+                        content=cached["content"],
+                        metadata={**cached["metadata"], "cached": True}
+                    )
+
+            invoke = lambda: self._invoke(prompt, use_tools, cache, request_key, endpoint, priority, cache_if)
+            if not self.coalesce:
+                return await invoke()
+
+            # Identical requests already in flight share one model call; each caller gets a copy
+            return await llm_singleflight.do(
+                request_key,
+                invoke,
+                copy_result=lambda response: response.model_copy(deep=True)
             )
-            
+
+        except QueueFullError:
+            # Backpressure is the caller's to report (HTTP 429)
+            raise
         except Exception as e:
             logger.error(f"Error executing agent: {e}")
             return AgentResponse(
@@ -102,6 +135,88 @@ class BaseAgent:
                 content="",
                 error=str(e)
             )
+
+    async def _invoke(
+        self,
+        prompt: str,
+        use_tools: bool,
+        cache: Optional[ResponseCache],
+        cache_key: str,
+        endpoint: str,
+        priority: int,
+        cache_if: Optional[Callable[[str], bool]] = None,
+    ) -> AgentResponse:
+        # One model call; the reply is stored in the cache when one is given and cache_if accepts it
+        messages = [
+            SystemMessage(content=self.system_prompt),
+            HumanMessage(content=prompt)
+        ]
+
+        # Wait for a slot under the agent and endpoint caps
+        async with self.scheduler.slot(self.__class__.__name__, endpoint, priority):
+            with observe_llm_call(self.config.model_name, endpoint):
+                # Use MCP tools if available
+                if self.tools_active(use_tools):
+                    # Agent with tools
+                    agent_executor = self.llm.bind_tools(self.mcp_tools)
+                    response = await agent_executor.ainvoke(messages)
+                else:
+                    # LLM without tools
+                    response = await self.llm.ainvoke(messages)
+
+        metadata = {
+            "model": self.config.model_name,
+            "tools_used": len(self.mcp_tools) if use_tools else 0
+        }
+        if cache is not None and isinstance(response.content, str) and (cache_if is None or cache_if(response.content)):
+            await cache.set(cache_key, {"content": response.content, "metadata": metadata})
+
+        return AgentResponse(
+            success=True,
+            content=response.content,
+            metadata=metadata
+        )
+    
+    async def stream(
+        self,
+        prompt: str,
+        use_cache: bool = True,
+        endpoint: str = "default",
+        priority: int = Priority.DEFAULT,
+        cache_if: Optional[Callable[[str], bool]] = None,
+        reservation=None,
+    ) -> AsyncIterator[str]:
+        # Stream reply text as it is generated (no tools); errors propagate to the caller.
+        # A reservation from reserve_slot() is used for the model call, or released on a cache hit.
+        cache_key = None
+        if use_cache and self.response_cache is not None:
+            cache_key = self.response_cache.make_key(self.config.model_name, self.system_prompt, prompt, False)
+            cached = await self.response_cache.get(cache_key, accept=cache_if)
+            if cached is not None:
+                if reservation is not None:
+                    self.release_slot(reservation)
+                yield cached["content"]
+                return
+
+        messages = [
+            SystemMessage(content=self.system_prompt),
+            HumanMessage(content=prompt)
+        ]
+
+        parts = []
+        async with self.scheduler.slot(self.__class__.__name__, endpoint, priority, reservation):
+            with observe_llm_call(self.config.model_name, endpoint):
+                async for chunk in self.llm.astream(messages):
+                    if isinstance(chunk.content, str) and chunk.content:
+                        parts.append(chunk.content)
+                        yield chunk.content
+
+        content = "".join(parts)
+        if cache_key is not None and (cache_if is None or cache_if(content)):
+            await self.response_cache.set(cache_key, {
+                "content": content,
+                "metadata": {"model": self.config.model_name, "tools_used": 0}
+            })
     
     def get_capabilities(self) -> List[str]:
         # Get agent capabilities
@@ -114,10 +229,10 @@ class BaseAgent:
 class SearchAgent(BaseAgent):
     # Web search and research agent
     
-    def __init__(self, config: AgentConfig):
+    def __init__(self, config: AgentConfig, **kwargs):
         system_prompt = "Research assistant with web search tools. Use search for current info, cite sources."
         
-        super().__init__(config, system_prompt)
+        super().__init__(config, system_prompt, **kwargs)
         
         # Web search MCP setup
         self.setup_web_search_mcp()
@@ -140,7 +255,7 @@ class SearchAgent(BaseAgent):
 class ChatAgent(BaseAgent):
     # General chat and assistance agent
     
-    def __init__(self, config: AgentConfig):
+    def __init__(self, config: AgentConfig, **kwargs):
         system_prompt = "Friendly conversational AI. Natural conversations, explanations, analysis. Helpful, harmless, honest."
         
-        super().__init__(config, system_prompt)
+        super().__init__(config, system_prompt, **kwargs)
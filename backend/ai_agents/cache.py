@@ -0,0 +1,176 @@
+# Two-tier response cache: in-process LRU backed by an optional Mongo collection
+
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    # Bounded LRU where every entry also expires after a TTL. on_evict(key, value) is
+    # called when an entry is dropped for size or age, not on pop() or clear().
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            if self.on_evict is not None:
+                self.on_evict(key, value)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            evicted_key, (evicted, _) = self._data.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted_key, evicted)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.pop(key, None)
+        return entry[0] if entry else None
+
+    def clear(self):
+        self._data.clear()
+
+
+def normalize_prompt(prompt: str) -> str:
+    # Whitespace-only differences should share a cache entry
+    return " ".join(prompt.split())
+
+
+class ResponseCache:
+    # Caches successful agent responses keyed on everything that shapes the reply
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        persistent_ttl: float = 86400.0,
+        collection=None,
+    ):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.persistent_ttl = persistent_ttl
+        self.collection = collection
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            maxsize=int(os.getenv("LLM_CACHE_MAXSIZE", "1024")),
+            ttl=float(os.getenv("LLM_CACHE_TTL", "300")),
+            persistent_ttl=float(os.getenv("LLM_CACHE_PERSISTENT_TTL", "86400")),
+        )
+
+    def attach_collection(self, collection):
+        # Enable the Mongo tier (documents expire via a TTL index on expires_at)
+        self.collection = collection
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str, use_tools: bool) -> str:
+        raw = "\x1f".join([model or "", system_prompt or "", normalize_prompt(prompt), "tools" if use_tools else "plain"])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(
+        self,
+        key: str,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        # A stored reply that accept() rejects is dropped and counted as a miss
+        value = self.memory.get(key)
+        if value is not None:
+            if accept is None or accept(value["content"]):
+                self.memory_hits += 1
+                return _copy(value)
+            self.memory.pop(key)
+
+        if self.collection is not None:
+            try:
+                doc = await self.collection.find_one(
+                    {"_id": key, "expires_at": {"$gt": datetime.utcnow()}},
+                    {"_id": 0, "content": 1, "metadata": 1},
+                )
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Response cache lookup failed: {e}")
+                doc = None
+            if doc is not None and (accept is None or accept(doc["content"])):
+                self.persistent_hits += 1
+                value = {"content": doc["content"], "metadata": doc.get("metadata", {})}
+                self.memory.set(key, value)
+                return _copy(value)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        self.memory.set(key, _copy(value))
+        self.stores += 1
+        if self.collection is None:
+            return
+        now = datetime.utcnow()
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {
+                    "content": value["content"],
+                    "metadata": value.get("metadata", {}),
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=self.persistent_ttl),
+                }},
+                upsert=True,
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache store failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.persistent_hits + self.misses
+        hits = self.memory_hits + self.persistent_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_size": len(self.memory),
+            "persistent_enabled": self.collection is not None,
+        }
+
+
+def _copy(value: Dict[str, Any]) -> Dict[str, Any]:
+    return {"content": value["content"], "metadata": dict(value.get("metadata") or {})}
+
+
+# Shared by every agent unless one is given its own cache
+response_cache = ResponseCache.from_env()
@@ -0,0 +1,22 @@
+# Agent configuration; kept apart from agents.py so it can be imported without LangChain
+
+import os
+from dataclasses import dataclass
+
+
+@dataclass
+class AgentConfig:
+    # AI agent configuration
+    api_base_url: str = None
+    model_name: str = None
+    api_key: str = None
+    
+    def __post_init__(self):
+        # Load from env if not provided
+        if self.api_base_url is None:
+            self.api_base_url = os.getenv("LITELLM_BASE_URL", "https://litellm-docker-545630944929.us-central1.run.app")
+        if self.model_name is None:
+            self.model_name = os.getenv("AI_MODEL_NAME", "gemini-2.5-pro")
+        if self.api_key is None:
+            # LITELLM_AUTH_TOKEN for AI API
+            self.api_key = os.getenv("LITELLM_AUTH_TOKEN", "dummy-key")
@@ -0,0 +1,38 @@
+# Hooks for timing model calls without tying the agents to a metrics backend
+
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Callable, List
+
+# observer(model, endpoint, seconds, outcome) with outcome "success", "error" or "cancelled"
+LLMObserver = Callable[[str, str, float, str], None]
+
+llm_observers: List[LLMObserver] = []
+
+
+def add_llm_observer(observer: LLMObserver):
+    if observer not in llm_observers:
+        llm_observers.append(observer)
+
+
+@contextmanager
+def observe_llm_call(model: str, endpoint: str):
+    if not llm_observers:
+        yield
+        return
+
+    started = time.perf_counter()
+    outcome = "success"
+    try:
+        yield
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome = "cancelled"
+        raise
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        for observer in llm_observers:
+            observer(model, endpoint, seconds, outcome)
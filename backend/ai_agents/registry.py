@@ -0,0 +1,115 @@
+# Long-lived agent registry: one instance per agent type, one shared HTTP pool
+
+import asyncio
+import importlib
+import logging
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional, Type, Union
+
+import httpx
+
+from .config import AgentConfig
+
+if TYPE_CHECKING:
+    from .agents import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+# An agent class, or its "module:attribute" path so LangChain is only imported
+# when the first agent is actually built
+AgentType = Union[str, Type["BaseAgent"]]
+
+DEFAULT_AGENT_TYPES: Dict[str, AgentType] = {
+    "chat": "ai_agents.agents:ChatAgent",
+    "search": "ai_agents.agents:SearchAgent",
+}
+
+
+def resolve_agent_type(agent_type: AgentType) -> Type["BaseAgent"]:
+    if not isinstance(agent_type, str):
+        return agent_type
+    module, _, attribute = agent_type.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+class AgentRegistry:
+    # Builds each agent type once (at startup or on first use) behind an async lock.
+    # All agents talk to AgentConfig.api_base_url through the same keep-alive pool.
+
+    def __init__(self, config: AgentConfig, agent_types: Optional[Dict[str, AgentType]] = None):
+        self.config = config
+        self.agent_types = dict(agent_types or DEFAULT_AGENT_TYPES)
+        self._agents: Dict[str, "BaseAgent"] = {}
+        self._lock = asyncio.Lock()
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._capabilities: Optional[Dict[str, List[str]]] = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            limits = httpx.Limits(
+                max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20")),
+                keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60")),
+            )
+            timeout = httpx.Timeout(float(os.getenv("LLM_HTTP_TIMEOUT", "120")), connect=10.0)
+            self._http_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+        return self._http_client
+
+    def get_cached(self, agent_type: str) -> Optional["BaseAgent"]:
+        return self._agents.get(agent_type)
+
+    async def get(self, agent_type: str) -> "BaseAgent":
+        agent = self._agents.get(agent_type)
+        if agent is not None:
+            return agent
+        if agent_type not in self.agent_types:
+            raise ValueError(f"Unknown agent type: {agent_type}")
+
+        async with self._lock:
+            # Another request may have built it while we waited
+            agent = self._agents.get(agent_type)
+            if agent is None:
+                agent_class = self.agent_types[agent_type]
+                if isinstance(agent_class, str):
+                    # First use imports the agent stack; do it off the event loop
+                    agent_class = await asyncio.to_thread(resolve_agent_type, agent_class)
+                    self.agent_types[agent_type] = agent_class
+                agent = agent_class(self.config, http_async_client=self.http_client)
+                self._agents[agent_type] = agent
+        return agent
+
+    async def preload(self):
+        # Import the agent classes in a worker thread without building any agent
+        for agent_type, agent_class in list(self.agent_types.items()):
+            if isinstance(agent_class, str):
+                try:
+                    self.agent_types[agent_type] = await asyncio.to_thread(resolve_agent_type, agent_class)
+                except Exception as e:
+                    logger.error(f"Failed to preload agent {agent_type}: {e}")
+
+    async def prewarm(self, ping: bool = False):
+        # Build every agent now; optionally open a pooled connection to the LLM proxy
+        for agent_type in self.agent_types:
+            await self.get(agent_type)
+        if ping:
+            try:
+                await self.http_client.get(self.config.api_base_url)
+            except httpx.HTTPError as e:
+                logger.warning(f"LLM connection prewarm failed: {e}")
+
+    async def capabilities(self) -> Dict[str, List[str]]:
+        if self._capabilities is None:
+            capabilities = {}
+            for agent_type in self.agent_types:
+                agent = await self.get(agent_type)
+                capabilities[f"{agent_type}_agent"] = agent.get_capabilities()
+            self._capabilities = capabilities
+        return {key: list(value) for key, value in self._capabilities.items()}
+
+    async def aclose(self):
+        self._agents.clear()
+        self._capabilities = None
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
@@ -0,0 +1,208 @@
+# Concurrency governor for model calls: per-agent and per-endpoint caps,
+# priority ordering and bounded queues with backpressure
+
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, Dict, List, Optional
+
+
+class Priority(IntEnum):
+    # Lower value is served first
+    INTERACTIVE = 0
+    DEFAULT = 1
+    BACKGROUND = 2
+
+
+class QueueFullError(Exception):
+    # Raised instead of queueing when the wait queue is at its configured depth
+    def __init__(self, retry_after: int, queue_depth: int):
+        super().__init__(f"LLM queue is full ({queue_depth} waiting), retry after {retry_after}s")
+        self.retry_after = retry_after
+        self.queue_depth = queue_depth
+
+
+class _Waiter:
+    # Also the reservation handed out by reserve(): granted once the future is done.
+    # settled is set when slot() takes it over or release() gives it back.
+    __slots__ = ("agent", "endpoint", "future", "enqueued_at", "cancelled", "settled")
+
+    def __init__(self, agent: str, endpoint: str):
+        self.agent = agent
+        self.endpoint = endpoint
+        self.future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.perf_counter()
+        self.cancelled = False
+        self.settled = False
+
+
+def _parse_limits(value: str) -> Dict[str, int]:
+    # "names=8,search=4" -> {"names": 8, "search": 4}
+    limits = {}
+    for item in value.split(","):
+        if "=" in item:
+            key, limit = item.split("=", 1)
+            limits[key.strip()] = int(limit)
+    return limits
+
+
+class LLMScheduler:
+    # A call runs once both its agent and its endpoint are under their caps.
+    # Waiters are granted in priority order (FIFO within a priority).
+
+    def __init__(
+        self,
+        agent_limit: int = 8,
+        endpoint_limits: Optional[Dict[str, int]] = None,
+        default_endpoint_limit: int = 8,
+        max_queue_depth: int = 50,
+        retry_after: float = 2.0,
+    ):
+        self.agent_limit = agent_limit
+        self.endpoint_limits = dict(endpoint_limits or {})
+        self.default_endpoint_limit = default_endpoint_limit
+        self.max_queue_depth = max_queue_depth
+        self.retry_after = retry_after
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._queued = 0
+        self._by_agent: Counter = Counter()
+        self._by_endpoint: Counter = Counter()
+        self.granted = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._service_ewma: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "LLMScheduler":
+        return cls(
+            agent_limit=int(os.getenv("LLM_MAX_CONCURRENCY_PER_AGENT", "8")),
+            endpoint_limits=_parse_limits(os.getenv("LLM_ENDPOINT_LIMITS", "names=8,chat=4,search=4,image=2")),
+            default_endpoint_limit=int(os.getenv("LLM_DEFAULT_ENDPOINT_LIMIT", "4")),
+            max_queue_depth=int(os.getenv("LLM_MAX_QUEUE_DEPTH", "50")),
+            retry_after=float(os.getenv("LLM_RETRY_AFTER", "2")),
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def _can_run(self, agent: str, endpoint: str) -> bool:
+        endpoint_limit = self.endpoint_limits.get(endpoint, self.default_endpoint_limit)
+        return self._by_agent[agent] < self.agent_limit and self._by_endpoint[endpoint] < endpoint_limit
+
+    def _estimate_retry_after(self) -> int:
+        # Time for the queue ahead to drain at current throughput, never below the configured floor
+        estimate = self.retry_after
+        if self._service_ewma is not None:
+            slots = max(1, min(self.agent_limit, sum(self.endpoint_limits.values()) or self.default_endpoint_limit))
+            estimate = max(estimate, self._service_ewma * self._queued / slots)
+        return max(1, math.ceil(estimate))
+
+    def reserve(self, agent: str, endpoint: str = "default", priority: int = Priority.DEFAULT) -> _Waiter:
+        # Take a slot now, or a place in the queue, without waiting; raises QueueFullError
+        # when the queue is full. For callers that must answer 429 before they start
+        # responding: pass the reservation to slot(), or hand it back with release().
+        waiter = _Waiter(agent, endpoint)
+        if self._queued == 0 and self._can_run(agent, endpoint):
+            self._acquire(agent, endpoint)
+            waiter.future.set_result(None)
+        else:
+            if self._queued >= self.max_queue_depth:
+                self.rejected += 1
+                raise QueueFullError(self._estimate_retry_after(), self._queued)
+            heapq.heappush(self._heap, (int(priority), next(self._seq), waiter))
+            self._queued += 1
+            self._dispatch()
+        return waiter
+
+    def release(self, reservation: _Waiter):
+        # Give back a reservation that slot() never used; safe to call more than once
+        if reservation.settled:
+            return
+        reservation.settled = True
+        if reservation.future.done() and not reservation.future.cancelled():
+            self._release(reservation.agent, reservation.endpoint)
+        else:
+            reservation.cancelled = True
+            self._queued -= 1
+
+    def _dispatch(self):
+        # Grant every waiter that fits, highest priority first
+        remaining = []
+        while self._heap:
+            item = heapq.heappop(self._heap)
+            waiter = item[2]
+            if waiter.cancelled:
+                continue
+            if self._can_run(waiter.agent, waiter.endpoint):
+                self._acquire(waiter.agent, waiter.endpoint)
+                self._queued -= 1
+                waited = time.perf_counter() - waiter.enqueued_at
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+                waiter.future.set_result(None)
+            else:
+                remaining.append(item)
+        for item in remaining:
+            heapq.heappush(self._heap, item)
+
+    def _acquire(self, agent: str, endpoint: str):
+        self._by_agent[agent] += 1
+        self._by_endpoint[endpoint] += 1
+        self.granted += 1
+
+    def _release(self, agent: str, endpoint: str):
+        self._by_agent[agent] -= 1
+        self._by_endpoint[endpoint] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        agent: str,
+        endpoint: str = "default",
+        priority: int = Priority.DEFAULT,
+        reservation: Optional[_Waiter] = None,
+    ):
+        waiter = reservation if reservation is not None else self.reserve(agent, endpoint, priority)
+        if waiter.settled:
+            raise RuntimeError("LLM slot reservation was already used or released")
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            # Hands the slot back if it was granted just as we were cancelled
+            self.release(waiter)
+            raise
+        waiter.settled = True
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            service = time.perf_counter() - started
+            self._service_ewma = service if self._service_ewma is None else 0.8 * self._service_ewma + 0.2 * service
+            self._release(waiter.agent, waiter.endpoint)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queued,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight_by_agent": {k: v for k, v in self._by_agent.items() if v},
+            "in_flight_by_endpoint": {k: v for k, v in self._by_endpoint.items() if v},
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_seconds_total / self.granted * 1000, 2) if self.granted else 0.0,
+            "max_wait_ms": round(self.wait_seconds_max * 1000, 2),
+        }
+
+
+# Shared by all agents in the process
+llm_scheduler = LLMScheduler.from_env()
@@ -0,0 +1,54 @@
+# Single-flight: concurrent identical requests share one in-flight execution
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    # The first caller for a key starts the work; callers arriving while it runs
+    # await the same task. Nothing is kept once it finishes, so results never go stale.
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[T]],
+        copy_result: Callable[[T], T] = copy.deepcopy,
+    ) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.leaders += 1
+        else:
+            self.followers += 1
+
+        # Shielded, so one caller disconnecting does not cancel the others' result
+        result = await asyncio.shield(task)
+        return copy_result(result)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "in_flight": len(self._inflight),
+        }
+
+
+# Shared by all agents; keys already include model and system prompt
+llm_singleflight = SingleFlight()
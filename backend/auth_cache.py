@@ -0,0 +1,72 @@
+# In-process cache of verified tokens and user identities for get_current_user
+
+import os
+import time
+from typing import Any, Dict, Optional
+
+from ai_agents.cache import TTLCache
+
+# Fields read from Mongo on every request instead of being cached; another worker's
+# write would otherwise leave this one serving a stale copy for up to the TTL
+UNCACHED_USER_FIELDS = ("favorites", "favorites_version")
+USER_IDENTITY_PROJECTION = {"_id": 0, **{field: 0 for field in UNCACHED_USER_FIELDS}}
+
+
+class AuthCache:
+    # Cached requests authenticate without a database round trip. Only the identity is
+    # kept (see UNCACHED_USER_FIELDS); writes to it must call invalidate_user().
+
+    def __init__(self, maxsize: int = None, ttl: float = None):
+        maxsize = maxsize or int(os.getenv("AUTH_CACHE_MAXSIZE", "10000"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("AUTH_CACHE_TTL", "60"))
+        self.tokens = TTLCache(maxsize=maxsize, ttl=self.ttl)
+        self.users = TTLCache(maxsize=maxsize, ttl=self.ttl)
+        self.token_hits = 0
+        self.token_misses = 0
+        self.user_hits = 0
+        self.user_misses = 0
+        self.invalidations = 0
+
+    def get_user_id(self, token: str) -> Optional[str]:
+        user_id = self.tokens.get(token)
+        if user_id is None:
+            self.token_misses += 1
+        else:
+            self.token_hits += 1
+        return user_id
+
+    def set_token(self, token: str, user_id: str, expires_at: Optional[float] = None):
+        # Never keep a token past its own expiry
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl > 0:
+            self.tokens.set(token, user_id, ttl=ttl)
+
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        doc = self.users.get(user_id)
+        if doc is None:
+            self.user_misses += 1
+            return None
+        self.user_hits += 1
+        return dict(doc)
+
+    def set_user(self, user_id: str, doc: Dict[str, Any]):
+        self.users.set(user_id, {k: v for k, v in doc.items() if k not in UNCACHED_USER_FIELDS})
+
+    def invalidate_user(self, user_id: str):
+        self.invalidations += 1
+        self.users.pop(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        user_lookups = self.user_hits + self.user_misses
+        return {
+            "token_hits": self.token_hits,
+            "token_misses": self.token_misses,
+            "user_hits": self.user_hits,
+            "user_misses": self.user_misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.user_hits / user_lookups, 4) if user_lookups else 0.0,
+            "tokens_cached": len(self.tokens),
+            "users_cached": len(self.users),
+        }
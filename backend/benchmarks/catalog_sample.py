@@ -0,0 +1,79 @@
+# Catalog sampling benchmark: NameCatalog.sample latency over a large synthetic catalog.
+#
+# sample() answers /api/names/generate from stored names on the event loop, so its cost
+# must not grow with the catalog. Times --count names per call with no filter, a gender
+# filter and gender + style. Exits non-zero when a median sample exceeds --budget-ms.
+#
+#   cd backend && python benchmarks/catalog_sample.py --names 300000 --budget-ms 1
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from benchmarks.name_search import SyntheticCollection, time_calls  # noqa: E402
+from name_catalog import NameCatalog  # noqa: E402
+
+GENDERS = ["boy", "girl", "unisex"]
+STYLES = ["traditional", "modern", "unique", "classic"]
+
+
+def main(args):
+    catalog = NameCatalog()
+    started = time.perf_counter()
+    asyncio.run(catalog.load(SyntheticCollection(args.names, args.seed)))
+    load_s = time.perf_counter() - started
+
+    rng = random.Random(args.seed + 1)
+    queries = range(args.queries)
+    results = {
+        "names": len(catalog),
+        "load_s": round(load_s, 2),
+        "count": args.count,
+        "queries": args.queries,
+        "sample": time_calls(lambda: catalog.sample(args.count), [() for _ in queries]),
+        "sample_gender": time_calls(
+            lambda g: catalog.sample(args.count, gender=g), [(rng.choice(GENDERS),) for _ in queries]
+        ),
+        "sample_gender_style": time_calls(
+            lambda g, s: catalog.sample(args.count, gender=g, style=s),
+            [(rng.choice(GENDERS), rng.choice(STYLES)) for _ in queries],
+        ),
+    }
+    results["budget_ms"] = args.budget_ms
+    results["within_budget"] = all(
+        results[kind]["p50_ms"] <= args.budget_ms for kind in ("sample", "sample_gender", "sample_gender_style")
+    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Random sampling latency over the name catalog")
+    parser.add_argument("--names", type=int, default=300_000)
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--budget-ms", type=float, default=1.0, help="fail when a median sample exceeds this")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = main(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{results['names']} names loaded in {results['load_s']} s")
+        for kind in ("sample", "sample_gender", "sample_gender_style"):
+            result = results[kind]
+            print(
+                f"{kind:20} p50 {result['p50_ms']:8.4f}  p95 {result['p95_ms']:8.4f}  "
+                f"p99 {result['p99_ms']:8.4f}  max {result['max_ms']:8.4f} ms"
+            )
+    if not results["within_budget"]:
+        sys.exit(1)
@@ -0,0 +1,143 @@
+# Cold-start benchmark: `python -X importtime -c "import server"` in a fresh interpreter.
+#
+# Reports the total import time of server (median of --runs) and the slowest imports,
+# and exits non-zero when the total exceeds the budget or when a module that must stay
+# out of the startup graph (LangChain, pandas, numpy, boto3, ...) was loaded.
+#
+#   cd backend && python benchmarks/import_time.py --budget-ms 1500
+#   IMPORT_TIME_BUDGET_MS=1000 python benchmarks/import_time.py --json
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+backend_dir = Path(__file__).parent.parent
+
+# Top-level packages that are loaded on demand and must not be imported by `import server`
+DEFERRED_MODULES = (
+    "langchain_openai",
+    "langchain_core",
+    "langchain_mcp_adapters",
+    "openai",
+    "tiktoken",
+    "mcp",
+    "pandas",
+    "numpy",
+    "boto3",
+    "botocore",
+)
+
+PROBE = (
+    "import json, sys\n"
+    "import server\n"
+    "print(json.dumps(sorted({name.split('.')[0] for name in sys.modules})))\n"
+)
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        name = fields[2].rstrip()
+        entries.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_us": int(fields[0]),
+            "cumulative_us": int(fields[1]),
+        })
+    return entries
+
+
+def measure_once() -> Dict:
+    env = dict(os.environ)
+    # server reads these at import time; nothing is contacted until startup
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "import_time_benchmark")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=str(backend_dir),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import server failed:\n{result.stderr[-2000:]}")
+
+    entries = parse_importtime(result.stderr)
+    # Children are listed before their parent; everything between the previous
+    # top-level entry and server was imported by server
+    end = next(index for index, entry in enumerate(entries) if entry["module"] == "server")
+    start = end
+    while start > 0 and entries[start - 1]["depth"] > 0:
+        start -= 1
+    server_entry = entries[end]
+    loaded = set(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        "total_ms": server_entry["cumulative_us"] / 1000,
+        "entries": entries[start:end],
+        "deferred_loaded": sorted(loaded & set(DEFERRED_MODULES)),
+    }
+
+
+def main(args) -> Dict:
+    # The first run also writes bytecode caches; it is not counted
+    measure_once()
+    runs = [measure_once() for _ in range(args.runs)]
+    totals = [run["total_ms"] for run in runs]
+    last = runs[-1]
+
+    # Slowest direct dependencies of server and their own dependencies, by cumulative time
+    slowest = sorted(
+        (entry for entry in last["entries"] if entry["depth"] <= args.depth),
+        key=lambda entry: entry["cumulative_us"],
+        reverse=True,
+    )[:args.top]
+
+    total_ms = statistics.median(totals)
+    return {
+        "total_ms": round(total_ms, 1),
+        "runs_ms": [round(total, 1) for total in totals],
+        "budget_ms": args.budget_ms,
+        "within_budget": total_ms <= args.budget_ms,
+        "deferred_loaded": last["deferred_loaded"],
+        "slowest": [
+            {"module": entry["module"], "cumulative_ms": round(entry["cumulative_us"] / 1000, 1)}
+            for entry in slowest
+        ],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time budget for the API server")
+    parser.add_argument(
+        "--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500")),
+        help="fail when the median import time of server exceeds this (default $IMPORT_TIME_BUDGET_MS or 1500)",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to measure; the median is reported")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--depth", type=int, default=2, help="nesting depth considered for the slowest list")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = main(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"import server: {results['total_ms']} ms (budget {results['budget_ms']} ms, runs {results['runs_ms']})")
+        for entry in results["slowest"]:
+            print(f"  {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+        if results["deferred_loaded"]:
+            print(f"Loaded at startup but should be deferred: {', '.join(results['deferred_loaded'])}")
+
+    if not results["within_budget"] or results["deferred_loaded"]:
+        sys.exit(1)
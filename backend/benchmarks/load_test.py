@@ -0,0 +1,294 @@
+# Offline load test: the full app under uvicorn, a stub OpenAI-compatible backend and
+# an in-memory (or local) Mongo, driven by a mix of register/login/generate/favorite/share
+# traffic at fixed concurrency. Reports throughput and p50/p95/p99 per endpoint.
+#
+# The in-memory store needs mongomock-motor (pip install mongomock-motor); pass
+# --mongo-url to use a local mongod instead.
+#
+#   cd backend && python benchmarks/load_test.py --concurrency 32 --duration 30 --json > before.json
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from benchmarks.stub_llm import ThreadedServer, build_app  # noqa: E402
+
+DEFAULT_MIX = "register=1,login=2,generate=5,favorite=3,favorites=2,share=1"
+GENDERS = [None, "boy", "girl", "unisex"]
+STYLES = [None, "traditional", "modern", "unique", "classic"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        if "=" in item:
+            action, weight = item.split("=", 1)
+            mix[action.strip()] = float(weight)
+    unknown = set(mix) - set(VirtualUser.ACTIONS)
+    if unknown:
+        raise SystemExit(f"Unknown actions in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, seconds: float, status: str, ok: bool):
+        self.latencies[endpoint].append(seconds * 1000)
+        self.statuses[endpoint][status] += 1
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def report(self, elapsed: float) -> Dict[str, Dict]:
+        endpoints = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            endpoints[endpoint] = {
+                "requests": len(values),
+                "errors": self.errors[endpoint],
+                "throughput_rps": round(len(values) / elapsed, 2),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "mean_ms": round(statistics.mean(values), 2),
+                "max_ms": round(max(values), 2),
+                "statuses": dict(self.statuses[endpoint]),
+            }
+        return endpoints
+
+
+class VirtualUser:
+    # One simulated visitor; actions that need a prerequisite (an account, some names,
+    # a favorite) perform it first, and that request is recorded like any other
+
+    ACTIONS = ("register", "login", "generate", "favorite", "favorites", "share")
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, run_id: str, number: int):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.run_id = run_id
+        self.number = number
+        self.accounts = 0
+        self.email: Optional[str] = None
+        self.token: Optional[str] = None
+        self.name_ids: List[str] = []
+        self.favorite_ids: List[str] = []
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    async def call(self, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(endpoint, time.perf_counter() - started, type(e).__name__, ok=False)
+            return None
+        self.recorder.record(endpoint, time.perf_counter() - started, str(response.status_code), ok=response.status_code < 400)
+        return response
+
+    async def register(self):
+        self.accounts += 1
+        self.email = f"load-{self.run_id}-{self.number}-{self.accounts}@example.com"
+        response = await self.call(
+            "POST /api/auth/register", "POST", "/api/auth/register",
+            json={"email": self.email, "password": "load-test-password"},
+        )
+        if response is not None and response.status_code == 200:
+            # Registration does not sign in; the frontend logs in right after
+            self.token = None
+            self.favorite_ids = []
+            await self.login()
+
+    async def login(self):
+        if self.email is None:
+            return await self.register()
+        response = await self.call(
+            "POST /api/auth/login", "POST", "/api/auth/login",
+            json={"email": self.email, "password": "load-test-password"},
+        )
+        if response is not None and response.status_code == 200:
+            self.token = response.json()["access_token"]
+
+    async def generate(self):
+        body = {"gender": self.rng.choice(GENDERS), "style": self.rng.choice(STYLES), "count": 10}
+        response = await self.call("POST /api/names/generate", "POST", "/api/names/generate", json=body)
+        if response is not None and response.status_code == 200:
+            self.name_ids = [name["id"] for name in response.json()]
+
+    async def favorite(self):
+        if self.token is None:
+            await self.register()
+        if not self.name_ids:
+            await self.generate()
+        if self.token is None or not self.name_ids:
+            return
+        name_id = self.rng.choice(self.name_ids)
+        response = await self.call(
+            "POST /api/favorites/add/{name_id}", "POST", f"/api/favorites/add/{name_id}", headers=self.headers
+        )
+        if response is not None and response.status_code == 200:
+            self.favorite_ids.append(name_id)
+
+    async def favorites(self):
+        if self.token is None:
+            await self.register()
+        if self.token is not None:
+            await self.call("GET /api/favorites", "GET", "/api/favorites", headers=self.headers)
+
+    async def share(self):
+        if not self.favorite_ids:
+            await self.favorite()
+        if not self.favorite_ids:
+            return
+        response = await self.call("POST /api/favorites/share", "POST", "/api/favorites/share", headers=self.headers)
+        if response is not None and response.status_code == 200:
+            share_token = response.json()["share_token"]
+            await self.call("GET /api/shared/{share_token}", "GET", f"/api/shared/{share_token}")
+
+    async def run(self, mix: Dict[str, float], deadline: float):
+        actions = list(mix)
+        weights = [mix[action] for action in actions]
+        while time.perf_counter() < deadline:
+            action = self.rng.choices(actions, weights)[0]
+            await getattr(self, action)()
+
+
+def configure_environment(args, llm_url: str):
+    # Must happen before server is imported: it reads its configuration at import time
+    os.environ["LITELLM_BASE_URL"] = llm_url
+    os.environ["AI_MODEL_NAME"] = args.model
+    os.environ.setdefault("LITELLM_AUTH_TOKEN", "load-test-key")
+    os.environ["MONGO_URL"] = args.mongo_url or "mongodb://localhost:27017"
+    os.environ["DB_NAME"] = args.db_name
+    os.environ["AGENT_PREWARM"] = "false"
+    if args.no_llm_cache:
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+
+
+def use_memory_store(server, db_name: str):
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit("The in-memory store needs mongomock-motor (pip install mongomock-motor), or pass --mongo-url")
+    server.client = AsyncMongoMockClient()
+    server.db = server.client[db_name]
+
+
+async def drive(args, app_url: str) -> Dict:
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=app_url, limits=limits, timeout=args.timeout) as client:
+        users = [
+            VirtualUser(client, recorder, random.Random(args.seed + number), run_id, number)
+            for number in range(args.concurrency)
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(*(user.run(parse_mix(args.mix), started + args.duration) for user in users))
+        elapsed = time.perf_counter() - started
+
+        server_stats = None
+        response = await client.get("/api/stats")
+        if response.status_code == 200:
+            server_stats = response.json()
+
+    endpoints = recorder.report(elapsed)
+    total = sum(endpoint["requests"] for endpoint in endpoints.values())
+    return {
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "throughput_rps": round(total / elapsed, 2),
+        "endpoints": endpoints,
+        "server_stats": server_stats,
+    }
+
+
+def main(args) -> Dict:
+    stub = ThreadedServer(build_app(args.llm_latency_ms, args.llm_tokens_per_second, args.llm_error_rate, args.seed)).start()
+    configure_environment(args, stub.url)
+
+    import server  # noqa: E402
+
+    if not args.mongo_url:
+        use_memory_store(server, args.db_name)
+
+    app_server = ThreadedServer(server.app, lifespan="on").start()
+    try:
+        results = asyncio.run(drive(args, app_server.url))
+    finally:
+        app_server.stop()
+        stub.stop()
+
+    results["config"] = {
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "mix": parse_mix(args.mix),
+        "mongo": "local" if args.mongo_url else "memory",
+        "llm_latency_ms": args.llm_latency_ms,
+        "llm_tokens_per_second": args.llm_tokens_per_second,
+        "llm_error_rate": args.llm_error_rate,
+        "llm_cache": not args.no_llm_cache,
+        "llm_requests": stub.server.config.app.state.requests,
+        "seed": args.seed,
+    }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline load test with a stub LLM backend")
+    parser.add_argument("--concurrency", type=int, default=16, help="simultaneous virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of traffic")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"action weights (default {DEFAULT_MIX})")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="stub time to first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--no-llm-cache", action="store_true", help="disable the LLM response cache")
+    parser.add_argument("--model", default="stub-model")
+    parser.add_argument("--mongo-url", default=None, help="local mongod instead of the in-memory store")
+    parser.add_argument("--db-name", default="name_bloom_load_test")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    results = main(args)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{results['requests']} requests in {results['duration_s']} s = {results['throughput_rps']} req/s, {results['errors']} errors")
+        for endpoint, result in results["endpoints"].items():
+            print(
+                f"{endpoint:36} {result['requests']:6} req {result['throughput_rps']:8.1f}/s  "
+                f"p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}  p99 {result['p99_ms']:8.2f} ms  "
+                f"errors {result['errors']}"
+            )
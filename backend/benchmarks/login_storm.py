@@ -0,0 +1,119 @@
+# Login storm benchmark: latency of a cheap endpoint while bcrypt verifications pile up.
+#
+# Compares the old inline bcrypt call (on the event loop) with PasswordHasher.
+# Runs in-process against the ASGI app; no Mongo or LLM needed.
+#
+#   cd backend && python benchmarks/login_storm.py --logins 64 --concurrency 32
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import bcrypt
+import httpx
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from password_hashing import PasswordHasher  # noqa: E402
+from server import app  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_storm(mode: str, logins: int, concurrency: int, hashed: str, hasher: PasswordHasher):
+    async def inline_verify():
+        # What login_user did before: bcrypt directly on the event loop
+        return bcrypt.checkpw(b"benchmark-password", hashed.encode("utf-8"))
+
+    async def pooled_verify():
+        return await hasher.verify("benchmark-password", hashed)
+
+    verify = inline_verify if mode == "inline" else pooled_verify
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            assert await verify()
+
+    probe_latencies = []
+    storm_done = asyncio.Event()
+
+    async def probe(client):
+        # Latency is measured from each probe's scheduled start, so time spent
+        # waiting for a blocked event loop is counted (no coordinated omission)
+        interval = 0.01
+        scheduled = time.perf_counter()
+        while True:
+            response = await client.get("/api/")
+            finished = time.perf_counter()
+            assert response.status_code == 200
+            probe_latencies.append((finished - scheduled) * 1000)
+            # Probes that should have started while the loop was blocked
+            scheduled += interval
+            while scheduled < finished:
+                probe_latencies.append((finished - scheduled) * 1000)
+                scheduled += interval
+            if storm_done.is_set():
+                break
+            await asyncio.sleep(scheduled - finished)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/api/")
+        prober = asyncio.create_task(probe(client))
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        storm_done.set()
+        await prober
+
+    return {
+        "mode": mode,
+        "logins": logins,
+        "logins_per_second": round(logins / elapsed, 1),
+        "probe_requests": len(probe_latencies),
+        "probe_p50_ms": round(percentile(probe_latencies, 50), 2),
+        "probe_p95_ms": round(percentile(probe_latencies, 95), 2),
+        "probe_max_ms": round(max(probe_latencies), 2),
+        "probe_mean_ms": round(statistics.mean(probe_latencies), 2),
+    }
+
+
+async def main(args):
+    hasher = PasswordHasher(max_workers=args.workers)
+    hashed = bcrypt.hashpw(b"benchmark-password", bcrypt.gensalt()).decode("utf-8")
+    results = []
+    for mode in ("inline", "executor"):
+        results.append(await run_storm(mode, args.logins, args.concurrency, hashed, hasher))
+    hasher.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print(
+                f"{result['mode']:9} {result['logins_per_second']:7.1f} logins/s   "
+                f"GET /api/ p50 {result['probe_p50_ms']:7.2f} ms  p95 {result['probe_p95_ms']:7.2f} ms  "
+                f"max {result['probe_max_ms']:7.2f} ms  ({result['probe_requests']} probe slots)"
+            )
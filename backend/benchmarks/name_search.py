@@ -0,0 +1,138 @@
+# Prefix search benchmark: NameCatalog.search latency over a large synthetic catalog.
+#
+# Loads --names distinct generated names through the same path as startup, then times
+# 1-3 letter prefixes of stored names with and without filters, and single-name inserts
+# into the loaded index. Exits non-zero when a median search exceeds --budget-ms.
+#
+#   cd backend && python benchmarks/name_search.py --names 1000000 --budget-ms 5
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from benchmarks.stub_llm import ORIGINS, SYLLABLES  # noqa: E402
+from name_catalog import NameCatalog, name_key  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def synthetic_name(rng: random.Random) -> dict:
+    spelling = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))).capitalize()
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "name": spelling,
+        "gender": rng.choice(["boy", "girl", "unisex"]),
+        "origin": rng.choice(ORIGINS),
+        "meaning": f"Meaning of {spelling}",
+        "popularity_score": rng.randint(1, 100),
+        "image_url": None,
+        "style": rng.choice(["traditional", "modern", "unique", "classic"]),
+    }
+
+
+class SyntheticCollection:
+    # Just enough of a Motor collection for NameCatalog.load
+
+    def __init__(self, count: int, seed: int):
+        self.count = count
+        self.seed = seed
+
+    def find(self, query, projection):
+        return self._docs()
+
+    async def _docs(self):
+        # The catalog drops repeats of spelling, gender and origin; only yield distinct names
+        rng = random.Random(self.seed)
+        seen = set()
+        while len(seen) < self.count:
+            doc = synthetic_name(rng)
+            key = name_key(doc["name"], doc["gender"], doc["origin"])
+            if key not in seen:
+                seen.add(key)
+                yield doc
+
+
+def time_calls(fn, args_list):
+    timings = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "p50_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(percentile(timings, 95), 4),
+        "p99_ms": round(percentile(timings, 99), 4),
+        "max_ms": round(max(timings), 4),
+    }
+
+
+def main(args):
+    catalog = NameCatalog()
+    started = time.perf_counter()
+    asyncio.run(catalog.load(SyntheticCollection(args.names, args.seed)))
+    load_s = time.perf_counter() - started
+
+    # Prefixes people actually type: the first 1-3 letters of stored names
+    rng = random.Random(args.seed + 1)
+    stored = rng.sample(catalog._spellings, min(args.queries, len(catalog)))
+    prefixes = [spelling[:rng.randint(1, 3)] for spelling in stored]
+    results = {
+        "names": len(catalog),
+        "load_s": round(load_s, 2),
+        "queries": args.queries,
+        "limit": args.limit,
+        "prefix": time_calls(lambda p: catalog.search(p, limit=args.limit), [(p,) for p in prefixes]),
+        "prefix_gender_origin": time_calls(
+            lambda p, g, o: catalog.search(p, gender=g, origin=o, limit=args.limit),
+            [(p, rng.choice(["boy", "girl"]), rng.choice(ORIGINS)) for p in prefixes],
+        ),
+        "prefix_popularity": time_calls(
+            lambda p: catalog.search(p, min_popularity=90, limit=args.limit), [(p,) for p in prefixes]
+        ),
+        "insert": time_calls(catalog.add, [(synthetic_name(rng),) for _ in range(args.inserts)]),
+    }
+    results["budget_ms"] = args.budget_ms
+    results["within_budget"] = all(
+        results[kind]["p50_ms"] <= args.budget_ms for kind in ("prefix", "prefix_gender_origin", "prefix_popularity")
+    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prefix search latency over the name catalog")
+    parser.add_argument("--names", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--inserts", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=5.0, help="fail when a median search exceeds this")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = main(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{results['names']} names loaded in {results['load_s']} s")
+        for kind in ("prefix", "prefix_gender_origin", "prefix_popularity", "insert"):
+            result = results[kind]
+            print(
+                f"{kind:22} p50 {result['p50_ms']:8.4f}  p95 {result['p95_ms']:8.4f}  "
+                f"p99 {result['p99_ms']:8.4f}  max {result['max_ms']:8.4f} ms"
+            )
+    if not results["within_budget"]:
+        sys.exit(1)
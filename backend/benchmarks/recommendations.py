@@ -0,0 +1,102 @@
+# Recommendation benchmark: NameRecommender over a large synthetic catalog, no LLM.
+#
+# Builds the feature matrix for --names names, then times recommend() for simulated
+# users with 3-30 favorites, with and without a gender filter, plus incremental adds.
+# Exits non-zero when the median recommendation exceeds --budget-ms.
+#
+#   cd backend && python benchmarks/recommendations.py --names 500000 --budget-ms 50
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from benchmarks.name_search import percentile, synthetic_name  # noqa: E402
+from recommendations import NameRecommender  # noqa: E402
+
+
+def summarize(timings):
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    docs = [synthetic_name(rng) for _ in range(args.names)]
+
+    recommender = NameRecommender.from_env()
+    started = time.perf_counter()
+    recommender.add(docs)
+    build_s = time.perf_counter() - started
+
+    plain, filtered = [], []
+    for _ in range(args.users):
+        favorites = rng.sample(docs, rng.randint(3, 30))
+        started = time.perf_counter()
+        recommender.recommend(favorites, args.limit)
+        plain.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        recommender.recommend(favorites, args.limit, gender=rng.choice(["boy", "girl"]))
+        filtered.append((time.perf_counter() - started) * 1000)
+
+    inserts = []
+    for _ in range(args.inserts):
+        doc = synthetic_name(rng)
+        started = time.perf_counter()
+        recommender.add([doc])
+        inserts.append((time.perf_counter() - started) * 1000)
+
+    results = {
+        **recommender.stats(),
+        "names": args.names,
+        "build_s": round(build_s, 2),
+        "users": args.users,
+        "limit": args.limit,
+        "recommend": summarize(plain),
+        "recommend_gender": summarize(filtered),
+        "insert": summarize(inserts),
+        "budget_ms": args.budget_ms,
+    }
+    results["within_budget"] = max(results["recommend"]["p50_ms"], results["recommend_gender"]["p50_ms"]) <= args.budget_ms
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recommendation latency over the name catalog")
+    parser.add_argument("--names", type=int, default=500_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--inserts", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="fail when a median recommendation exceeds this")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = main(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(
+            f"{results['names']} names, {results['ngram_dims']} n-gram features, {results['origins']} origins, "
+            f"{results['memory_mb']} MB built in {results['build_s']} s"
+        )
+        for kind in ("recommend", "recommend_gender", "insert"):
+            result = results[kind]
+            print(
+                f"{kind:17} p50 {result['p50_ms']:8.3f}  p95 {result['p95_ms']:8.3f}  "
+                f"p99 {result['p99_ms']:8.3f}  max {result['max_ms']:8.3f} ms"
+            )
+    if not results["within_budget"]:
+        sys.exit(1)
@@ -0,0 +1,105 @@
+# List serialization benchmark: per-item cost of encoding favorites/shared/status lists.
+#
+# "before" is what the routes used to do: build a model per document, let FastAPI
+# re-validate the list against response_model, convert it to JSON-able data and
+# encode it with the json module. "after" hands the stored documents to orjson.
+#
+#   cd backend && python benchmarks/serialization.py --items 100 1000 10000
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from server import Name, StatusCheck  # noqa: E402
+
+
+def name_docs(count: int):
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Name{i}",
+            "gender": ("boy", "girl", "unisex")[i % 3],
+            "origin": "Latin",
+            "meaning": "A fairly ordinary meaning for benchmarking",
+            "popularity_score": i % 100 + 1,
+            "image_url": None,
+            "style": "modern",
+        }
+        for i in range(count)
+    ]
+
+
+def status_docs(count: int):
+    return [{"id": str(uuid.uuid4()), "client_name": f"client-{i % 7}", "timestamp": datetime.utcnow()} for i in range(count)]
+
+
+def before(model, docs):
+    # Route: model per document; FastAPI: dump, validate against List[model], serialize, json.dumps
+    objects = [model(**doc) for doc in docs]
+    adapter = TypeAdapter(List[model])
+    content = [obj.model_dump() for obj in objects]
+    validated = adapter.validate_python(content)
+    jsonable = adapter.dump_python(validated, mode="json")
+    return json.dumps(jsonable, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def after(model, docs):
+    return ORJSONResponse(docs).body
+
+
+def per_item_us(fn, model, docs, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(model, docs)
+        best = min(best, time.perf_counter() - started)
+    return best / len(docs) * 1e6
+
+
+def main(args):
+    results = []
+    for label, model, make_docs in (("names", Name, name_docs), ("status", StatusCheck, status_docs)):
+        for count in args.items:
+            docs = make_docs(count)
+            assert orjson.loads(after(model, docs)) == json.loads(before(model, docs))
+            before_us = per_item_us(before, model, docs, args.repeat)
+            after_us = per_item_us(after, model, docs, args.repeat)
+            results.append({
+                "payload": label,
+                "items": count,
+                "before_us_per_item": round(before_us, 3),
+                "after_us_per_item": round(after_us, 3),
+                "speedup": round(before_us / after_us, 1),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-item cost of list serialization")
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = main(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print(
+                f"{result['payload']:7} {result['items']:6} items   before {result['before_us_per_item']:7.3f} us/item   "
+                f"after {result['after_us_per_item']:7.3f} us/item   x{result['speedup']}"
+            )
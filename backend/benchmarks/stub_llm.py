@@ -0,0 +1,172 @@
+# OpenAI-compatible stub backend for offline benchmarks.
+#
+# Answers /chat/completions (plain and streamed) with canned replies shaped like the
+# app's prompts: a JSON array for name generation, a JSON object for batched requests,
+# an image URL for image prompts. Latency, token rate and error rate are configurable.
+#
+#   cd backend && python benchmarks/stub_llm.py --port 4010 --latency-ms 300 --tokens-per-second 150
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ORIGINS = ["Latin", "Greek", "Hebrew", "Irish", "Germanic", "Japanese", "Arabic", "Sanskrit", "Yoruba", "Norse"]
+SYLLABLES = ["a", "bel", "cia", "da", "el", "fio", "ga", "hil", "is", "jo", "ka", "li", "mae", "no", "ra", "sa", "ta", "vi", "wen", "zu"]
+
+
+def fake_names(count: int, gender: Optional[str], rng: random.Random):
+    names = []
+    for _ in range(count):
+        spelling = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        names.append({
+            "name": spelling,
+            "gender": gender or rng.choice(["boy", "girl", "unisex"]),
+            "origin": rng.choice(ORIGINS),
+            "meaning": f"Stub meaning of {spelling}",
+            "popularity_score": rng.randint(1, 100),
+        })
+    return names
+
+
+def reply_for(prompt: str, rng: random.Random) -> str:
+    # Batched name requests: one section per request id
+    sections = re.findall(r"- (r\d+): (\d+) baby names(?: for (\w+?)s\b)?", prompt)
+    if sections:
+        return json.dumps({rid: fake_names(int(count), gender or None, rng) for rid, count, gender in sections})
+
+    match = re.search(r"Generate (\d+) baby names(?: for (\w+?)s\b)?", prompt)
+    if match:
+        return json.dumps(fake_names(int(match.group(1)), match.group(2), rng))
+
+    if "generate an image" in prompt:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        return f"https://images.example.com/{digest}.png"
+
+    return "This is a stub reply from the offline benchmark backend."
+
+
+def build_app(latency_ms: float = 200.0, tokens_per_second: float = 200.0, error_rate: float = 0.0, seed: Optional[int] = None) -> FastAPI:
+    app = FastAPI(title="Stub LLM")
+    rng = random.Random(seed)
+    app.state.requests = 0
+    app.state.errors = 0
+
+    def completion_delay(text: str) -> float:
+        # Roughly four characters per token
+        tokens = max(1, len(text) // 4)
+        return tokens / tokens_per_second if tokens_per_second > 0 else 0.0
+
+    @app.post("/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []) if m.get("role") == "user")
+        model = body.get("model", "stub")
+
+        await asyncio.sleep(latency_ms / 1000)
+        if rng.random() < error_rate:
+            app.state.errors += 1
+            return JSONResponse(status_code=500, content={"error": {"message": "stub failure", "type": "server_error"}})
+
+        content = reply_for(prompt, rng)
+        created = int(time.time())
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        if not body.get("stream"):
+            await asyncio.sleep(completion_delay(content))
+            tokens = max(1, len(content) // 4)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": tokens, "total_tokens": len(prompt) // 4 + tokens},
+            }
+
+        async def chunks():
+            def event(delta, finish_reason=None):
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+                return f"data: {json.dumps(payload)}\n\n"
+
+            yield event({"role": "assistant", "content": ""})
+            step = 32  # characters per chunk, about 8 tokens
+            for start in range(0, len(content), step):
+                piece = content[start:start + step]
+                await asyncio.sleep(completion_delay(piece))
+                yield event({"content": piece})
+            yield event({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ThreadedServer:
+    # Runs an ASGI app under uvicorn on its own thread and event loop
+
+    def __init__(self, app, port: Optional[int] = None, lifespan: str = "off"):
+        self.port = port or free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan=lifespan)
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 30.0) -> "ThreadedServer":
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Server on port {self.port} failed to start")
+            time.sleep(0.05)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub backend")
+    parser.add_argument("--port", type=int, default=4010)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with HTTP 500")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        build_app(args.latency_ms, args.tokens_per_second, args.error_rate, args.seed),
+        host="127.0.0.1",
+        port=args.port,
+        log_level="warning",
+    )
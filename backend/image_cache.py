@@ -0,0 +1,85 @@
+# Content-addressed image cache: one generated image per distinct prompt and model
+
+import hashlib
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from ai_agents.cache import TTLCache, normalize_prompt
+
+logger = logging.getLogger(__name__)
+
+
+class ImageCache:
+    # Image prompts depend only on the name and gender, so every stored copy of
+    # "Olivia / girl" maps to the same key. Entries live in Mongo (no expiry) with
+    # a small in-process LRU in front.
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 3600.0, collection=None):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.collection = collection
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "ImageCache":
+        return cls(
+            maxsize=int(os.getenv("IMAGE_CACHE_MAXSIZE", "2048")),
+            ttl=float(os.getenv("IMAGE_CACHE_TTL", "3600")),
+        )
+
+    def attach_collection(self, collection):
+        self.collection = collection
+
+    @staticmethod
+    def make_key(prompt: str, model: str) -> str:
+        raw = "\x1f".join([model or "", normalize_prompt(prompt)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        image_url = self.memory.get(key)
+        if image_url is None and self.collection is not None:
+            try:
+                doc = await self.collection.find_one({"_id": key}, {"_id": 0, "image_url": 1})
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Image cache lookup failed: {e}")
+                doc = None
+            if doc is not None:
+                image_url = doc["image_url"]
+                self.memory.set(key, image_url)
+
+        if image_url is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return image_url
+
+    async def set(self, key: str, image_url: str, prompt: str, model: str):
+        self.memory.set(key, image_url)
+        self.stores += 1
+        if self.collection is None:
+            return
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {"image_url": image_url, "prompt": prompt, "model": model, "created_at": datetime.utcnow()}},
+                upsert=True,
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Image cache store failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_size": len(self.memory),
+        }
@@ -0,0 +1,227 @@
+# Mongo-backed image generation jobs, worked by a pool of background tasks
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from ai_agents.scheduler import QueueFullError
+from metrics import errors as error_counter
+
+logger = logging.getLogger(__name__)
+
+JOB_PROJECTION = {"_id": 0, "active": 0, "user_ids": 0}
+
+
+def retention_seconds() -> int:
+    # Finished jobs expire through a TTL index on finished_at; IMAGE_JOB_RETENTION_DAYS=0 keeps them
+    return int(float(os.getenv("IMAGE_JOB_RETENTION_DAYS", "7")) * 86400)
+
+
+class ImageJobQueue:
+    # A job is "active" while queued or running; a partial unique index on
+    # (name_id, active=True) keeps one in-flight job per name across workers and processes.
+    # Workers claim jobs atomically, so several app instances can share the collection.
+    # user_ids lists everyone whose request the job answers; only they can read it.
+
+    def __init__(
+        self,
+        render: Callable[[str], Awaitable[str]],
+        workers: int = 2,
+        poll_interval: float = 5.0,
+        stale_after: float = 600.0,
+    ):
+        self.render = render
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.collection = None
+        self._wake: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self.enqueued = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls, render: Callable[[str], Awaitable[str]]) -> "ImageJobQueue":
+        return cls(
+            render,
+            workers=int(os.getenv("IMAGE_JOB_WORKERS", "2")),
+            poll_interval=float(os.getenv("IMAGE_JOB_POLL_INTERVAL", "5")),
+            stale_after=float(os.getenv("IMAGE_JOB_STALE_SECONDS", "600")),
+        )
+
+    async def start(self, collection):
+        self.collection = collection
+        self._wake = asyncio.Queue()
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        # The flag covers a cancel swallowed by wait_for when a wake-up lands at the same moment
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _join_active(self, name_id: str, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        # The in-flight job for this name, with user_id added to the users it answers
+        query = {"name_id": name_id, "active": True}
+        if not user_id:
+            return await self.collection.find_one(query, JOB_PROJECTION)
+        return await self.collection.find_one_and_update(
+            query,
+            {"$addToSet": {"user_ids": user_id}},
+            projection=JOB_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def enqueue(self, name_id: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+        # Returns the in-flight job for this name if there is one, otherwise a new queued job
+        existing = await self._join_active(name_id, user_id)
+        if existing:
+            self.deduplicated += 1
+            return existing
+
+        now = datetime.utcnow()
+        job = {
+            "id": str(uuid.uuid4()),
+            "name_id": name_id,
+            "user_id": user_id,
+            "user_ids": [user_id] if user_id else [],
+            "status": "queued",
+            "active": True,
+            "image_url": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        try:
+            await self.collection.insert_one(dict(job))
+        except DuplicateKeyError:
+            # Another request queued the same name between our read and insert
+            existing = await self._join_active(name_id, user_id)
+            if existing:
+                self.deduplicated += 1
+                return existing
+            raise
+
+        self.enqueued += 1
+        if self._wake is not None:
+            self._wake.put_nowait(None)
+        return {key: value for key, value in job.items() if key not in JOB_PROJECTION}
+
+    async def record_done(self, name_id: str, image_url: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+        # A request answered without queueing (the image was already cached). It reuses the
+        # name's finished job, so repeat requests do not add documents.
+        now = datetime.utcnow()
+        update = {
+            "$set": {"image_url": image_url, "error": None, "updated_at": now, "finished_at": now},
+            "$setOnInsert": {"id": str(uuid.uuid4()), "user_id": user_id, "active": False, "created_at": now},
+        }
+        if user_id:
+            update["$addToSet"] = {"user_ids": user_id}
+        job = await self.collection.find_one_and_update(
+            {"name_id": name_id, "status": "done"},
+            update,
+            projection=JOB_PROJECTION,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self.completed += 1
+        return job
+
+    async def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        # With user_id, only a job that answers that user's request
+        query: Dict[str, Any] = {"id": job_id}
+        if user_id is not None:
+            query["$or"] = [{"user_ids": user_id}, {"user_id": user_id}]
+        return await self.collection.find_one(query, JOB_PROJECTION)
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        # Queued jobs, plus running jobs started more than stale_after ago: their worker
+        # died or its process restarted. Checked on every poll, not only at startup.
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=self.stale_after)
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "queued"},
+                {"status": "running", "started_at": {"$lt": stale_before}},
+            ]},
+            {"$set": {"status": "running", "started_at": now, "updated_at": now}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _finish(self, job: Dict[str, Any], fields: Dict[str, Any]):
+        await self.collection.update_one(
+            {"id": job["id"]},
+            {"$set": {**fields, "updated_at": datetime.utcnow()}},
+        )
+
+    async def _worker(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.get(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            # Drain everything claimable; the poll also picks up jobs queued by other processes
+            while not self._stopping:
+                try:
+                    job = await self._claim()
+                except Exception as e:
+                    logger.error(f"Error claiming image job: {e}")
+                    break
+                if job is None:
+                    break
+                await self._run(job)
+
+    async def _run(self, job: Dict[str, Any]):
+        try:
+            image_url = await self.render(job["name_id"])
+        except asyncio.CancelledError:
+            # Shutting down: leave the job for the next worker
+            await asyncio.shield(self._finish(job, {"status": "queued"}))
+            raise
+        except QueueFullError as e:
+            # The model is saturated; put the job back and give it room
+            await self._finish(job, {"status": "queued"})
+            await asyncio.sleep(e.retry_after)
+            return
+        except Exception as e:
+            logger.error(f"Image job {job['id']} for name {job['name_id']} failed: {e}")
+            self.failed += 1
+            error_counter.inc("image_job")
+            await self._finish(job, {
+                "status": "failed",
+                "active": False,
+                "error": str(e),
+                "finished_at": datetime.utcnow(),
+            })
+            return
+
+        self.completed += 1
+        await self._finish(job, {
+            "status": "done",
+            "active": False,
+            "image_url": image_url,
+            "finished_at": datetime.utcnow(),
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "enqueued": self.enqueued,
+            "deduplicated": self.deduplicated,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
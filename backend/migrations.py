@@ -0,0 +1,270 @@
+# Versioned index migrations for the Mongo collections, applied from startup_event.
+# Every migration must be idempotent: several workers may start at the same time.
+
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from name_catalog import name_key
+from phonetic import phonetic_keys
+from image_jobs import retention_seconds as image_job_retention_seconds
+from status_checks import retention_seconds
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+BACKFILL_BATCH_SIZE = 1000
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Any], Awaitable[None]]
+
+
+class IndexPlanError(RuntimeError):
+    # Raised when a hot query would scan a whole collection
+    pass
+
+
+async def create_core_indexes(db):
+    await db.users.create_index("email", unique=True)
+    await db.users.create_index("id", unique=True)
+    await db.names.create_index("id", unique=True)
+    await db.favorites_lists.create_index("share_token", unique=True)
+
+
+async def backfill_name_keys(db):
+    # Give legacy names a name_key; later copies of the same name point at the first one
+    owners: Dict[str, str] = {}
+    async for doc in db.names.find({"name_key": {"$exists": True}}, {"_id": 0, "id": 1, "name_key": 1}):
+        owners[doc["name_key"]] = doc["id"]
+
+    ops = []
+    cursor = db.names.find(
+        {"name_key": {"$exists": False}, "duplicate_of": {"$exists": False}},
+        {"_id": 1, "id": 1, "name": 1, "gender": 1, "origin": 1},
+    ).sort("_id", ASCENDING)
+    async for doc in cursor:
+        key = name_key(doc.get("name", ""), doc.get("gender", ""), doc.get("origin", ""))
+        if key in owners:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"duplicate_of": owners[key]}}))
+        else:
+            owners[key] = doc["id"]
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"name_key": key}}))
+        if len(ops) >= BACKFILL_BATCH_SIZE:
+            await db.names.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await db.names.bulk_write(ops, ordered=False)
+
+    await db.names.create_index(
+        "name_key",
+        unique=True,
+        partialFilterExpression={"name_key": {"$exists": True}},
+    )
+
+
+async def create_catalog_indexes(db):
+    await db.names.create_index([("gender", ASCENDING), ("style", ASCENDING), ("popularity_score", ASCENDING)])
+    await db.names.create_index([("origin", ASCENDING), ("popularity_score", ASCENDING)])
+
+
+async def create_llm_cache_ttl(db):
+    await db.llm_cache.create_index("expires_at", expireAfterSeconds=0)
+
+
+async def create_share_owner_index(db):
+    await db.favorites_lists.create_index("user_id")
+
+
+async def create_image_job_indexes(db):
+    await db.image_jobs.create_index("id", unique=True)
+    # One in-flight job per name; finished jobs drop out of the index
+    await db.image_jobs.create_index(
+        "name_id",
+        unique=True,
+        partialFilterExpression={"active": True},
+    )
+    await db.image_jobs.create_index([("status", ASCENDING), ("created_at", ASCENDING)])
+
+
+async def create_name_gender_index(db):
+    # Image backfill finds every copy of a name and gender
+    await db.names.create_index([("name", ASCENDING), ("gender", ASCENDING)])
+
+
+async def backfill_phonetic_keys(db):
+    # Compute phonetic keys for names stored before they existed, in bulk batches
+    ops = []
+    cursor = db.names.find({"phonetic_keys": {"$exists": False}}, {"_id": 1, "name": 1})
+    async for doc in cursor:
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"phonetic_keys": phonetic_keys(doc.get("name", ""))}}))
+        if len(ops) >= BACKFILL_BATCH_SIZE:
+            await db.names.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await db.names.bulk_write(ops, ordered=False)
+    await db.names.create_index("phonetic_keys")
+
+
+async def create_status_check_indexes(db):
+    # Newest-first paging, per-client summaries, and retention by TTL on timestamp
+    await db.status_checks.create_index([("timestamp", DESCENDING), ("id", DESCENDING)])
+    await db.status_checks.create_index([("client_name", ASCENDING), ("timestamp", ASCENDING)])
+    seconds = retention_seconds()
+    if seconds > 0:
+        await db.status_checks.create_index("timestamp", expireAfterSeconds=seconds)
+
+
+async def sync_ttl_index(db, collection: str, field: str, seconds: int, setting: str) -> Optional[int]:
+    # Retention settings may change between deploys; keep the TTL index on `field` in step
+    coll = getattr(db, collection)
+    indexes = await coll.index_information()
+    current = indexes.get(f"{field}_1", {}).get("expireAfterSeconds")
+    if seconds <= 0:
+        if current is not None:
+            logger.warning(f"{setting}=0 but {collection} still has a TTL index; drop {field}_1 to keep history")
+        return current
+    if current is None:
+        await coll.create_index(field, expireAfterSeconds=seconds)
+    elif current != seconds:
+        await db.command({
+            "collMod": collection,
+            "index": {"keyPattern": {field: 1}, "expireAfterSeconds": seconds},
+        })
+    return seconds
+
+
+async def sync_status_retention(db) -> Optional[int]:
+    return await sync_ttl_index(db, "status_checks", "timestamp", retention_seconds(), "STATUS_RETENTION_DAYS")
+
+
+async def sync_image_job_retention(db) -> Optional[int]:
+    return await sync_ttl_index(
+        db, "image_jobs", "finished_at", image_job_retention_seconds(), "IMAGE_JOB_RETENTION_DAYS"
+    )
+
+
+async def create_image_job_retention_indexes(db):
+    # Finished jobs expire by TTL on finished_at (in-flight jobs have none); record_done
+    # finds a name's finished job by (name_id, status)
+    await db.image_jobs.create_index([("name_id", ASCENDING), ("status", ASCENDING)])
+    seconds = image_job_retention_seconds()
+    if seconds > 0:
+        await db.image_jobs.create_index("finished_at", expireAfterSeconds=seconds)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "unique indexes for users, names and shared lists", create_core_indexes),
+    Migration(2, "backfill names.name_key and index it", backfill_name_keys),
+    Migration(3, "compound indexes for catalog queries", create_catalog_indexes),
+    Migration(4, "TTL index for the LLM response cache", create_llm_cache_ttl),
+    Migration(5, "index shared lists by owner for snapshot refresh", create_share_owner_index),
+    Migration(6, "indexes for the image job queue", create_image_job_indexes),
+    Migration(7, "index names by name and gender for image backfill", create_name_gender_index),
+    Migration(8, "paging, summary and TTL retention indexes for status checks", create_status_check_indexes),
+    Migration(9, "backfill names.phonetic_keys and index it", backfill_phonetic_keys),
+    Migration(10, "TTL retention and per-name lookup for finished image jobs", create_image_job_retention_indexes),
+]
+
+
+async def run_migrations(db, migrations: List[Migration] = MIGRATIONS) -> List[int]:
+    # Apply pending migrations in version order; stop at the first failure
+    applied = set()
+    async for doc in db[MIGRATIONS_COLLECTION].find({}, {"_id": 1}):
+        applied.add(doc["_id"])
+
+    newly_applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in applied:
+            continue
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        await migration.apply(db)
+        await db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": migration.version},
+            {"$set": {"description": migration.description, "applied_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        newly_applied.append(migration.version)
+    return newly_applied
+
+
+# (collection, filter) pairs served on every request; each must use an index
+HOT_QUERIES = [
+    ("users", {"email": "plan-check@example.com"}),
+    ("users", {"id": "plan-check"}),
+    ("names", {"id": {"$in": ["plan-check"]}}),
+    ("names", {"name_key": {"$in": ["plan-check|girl|latin"]}}),
+    ("names", {"name_key": {"$regex": "^plan"}}),
+    ("names", {"phonetic_keys": {"$in": ["M:PLN", "R:ALN"]}}),
+    ("names", {"gender": "girl", "style": "modern"}),
+    ("names", {"name": "Plan", "gender": "girl", "image_url": None}),
+    ("favorites_lists", {"share_token": "plan-check"}),
+    ("favorites_lists", {"user_id": "plan-check"}),
+    ("image_jobs", {"id": "plan-check"}),
+    ("image_jobs", {"name_id": "plan-check", "active": True}),
+    ("image_jobs", {"name_id": "plan-check", "status": "done"}),
+    ("image_jobs", {"$or": [{"status": "queued"}, {"status": "running", "started_at": {"$lt": datetime(2000, 1, 1)}}]}),
+    ("status_checks", {"client_name": "plan-check", "timestamp": {"$gte": datetime(2000, 1, 1)}}),
+]
+
+
+def _has_collscan(plan: Any) -> bool:
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_has_collscan(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collscan(value) for value in plan)
+    return False
+
+
+async def check_query_plans(db, queries=HOT_QUERIES) -> Dict[str, str]:
+    # Run explain() on every hot query and fail if any winning plan is a collection scan
+    plans = {}
+    failures = []
+    for collection, query in queries:
+        explanation = await db[collection].find(query).explain()
+        winning_plan = explanation.get("queryPlanner", {}).get("winningPlan", {})
+        label = f"{collection} {query}"
+        if _has_collscan(winning_plan):
+            plans[label] = "COLLSCAN"
+            failures.append(label)
+        else:
+            plans[label] = "indexed"
+    if failures:
+        raise IndexPlanError(f"Collection scans in hot queries: {'; '.join(failures)}")
+    return plans
+
+
+async def main(check: bool):
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / ".env")
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    db = client[os.environ["DB_NAME"]]
+    try:
+        applied = await run_migrations(db)
+        print(f"Applied migrations: {applied or 'none pending'}")
+        if check:
+            for label, result in (await check_query_plans(db)).items():
+                print(f"{result:8} {label}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main(check="--check" in sys.argv))
+    except IndexPlanError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
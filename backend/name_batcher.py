@@ -0,0 +1,157 @@
+# Micro-batching of concurrent name-generation requests into one model call
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from metrics import fallbacks as fallback_counter, parse_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class NameGenerationFailed(Exception):
+    # The model call itself failed (as opposed to returning unparseable text)
+    pass
+
+
+@dataclass
+class NameBatchItem:
+    count: int
+    gender: Optional[str] = None
+    style: Optional[str] = None
+    exclude: List[str] = field(default_factory=list)
+
+    def describe(self) -> str:
+        text = f"{self.count} baby names"
+        if self.gender:
+            text += f" for {self.gender}s"
+        if self.style:
+            text += f" in {self.style} style"
+        if self.exclude:
+            text += f" (do not include: {', '.join(self.exclude)})"
+        return text
+
+
+def build_batch_prompt(items: List[Tuple[str, NameBatchItem]]) -> str:
+    sections = "\n".join(f"        - {request_id}: {item.describe()}" for request_id, item in items)
+    return f"""Generate baby names for several independent requests:
+{sections}
+        For each name, provide:
+        - name: the actual name
+        - gender: "boy", "girl", or "unisex"
+        - origin: cultural/linguistic origin
+        - meaning: what the name means
+        - popularity_score: number from 1-100 indicating popularity (50 = average)
+
+        Return only a JSON object whose keys are the request ids above and whose values are JSON arrays of name objects. No additional text."""
+
+
+def parse_batch_sections(content: str) -> Dict[str, Any]:
+    # Tolerates prose or ```json fences around the object
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(content[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+class NameRequestBatcher:
+    # Requests arriving within window_ms share one structured prompt with a section per
+    # request id. A section that is missing or malformed is retried as an individual request.
+
+    def __init__(
+        self,
+        execute: Callable[[str], Awaitable[Any]],
+        single: Callable[[NameBatchItem], Awaitable[Optional[List[Dict[str, Any]]]]],
+        window_ms: float = 5.0,
+        max_batch: int = 8,
+    ):
+        self.execute = execute
+        self.single = single
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, NameBatchItem, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._next_id = 0
+        self._tasks = set()
+        self.batches = 0
+        self.batched_requests = 0
+        self.fallbacks = 0
+
+    async def submit(self, item: NameBatchItem) -> Optional[List[Dict[str, Any]]]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._next_id += 1
+        self._pending.append((f"r{self._next_id}", item, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, NameBatchItem, asyncio.Future]]):
+        if len(batch) == 1:
+            request_id, item, future = batch[0]
+            await self._resolve(future, self.single(item))
+            return
+
+        self.batches += 1
+        self.batched_requests += len(batch)
+        sections: Dict[str, Any] = {}
+        try:
+            result = await self.execute(build_batch_prompt([(request_id, item) for request_id, item, _ in batch]))
+            if result.success:
+                with parse_seconds.time("names_batch"):
+                    sections = parse_batch_sections(result.content)
+        except Exception as e:
+            logger.warning(f"Batched name generation failed, retrying individually: {e}")
+
+        for request_id, item, future in batch:
+            section = sections.get(request_id)
+            if isinstance(section, list) and section and all(isinstance(entry, dict) for entry in section):
+                if not future.done():
+                    future.set_result(section[:item.count])
+            else:
+                self.fallbacks += 1
+                fallback_counter.inc("batch_section")
+                task = asyncio.ensure_future(self._resolve(future, self.single(item)))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _resolve(future: asyncio.Future, work: Awaitable):
+        try:
+            result = await work
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window * 1000,
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "fallbacks": self.fallbacks,
+            "pending": len(self._pending),
+        }
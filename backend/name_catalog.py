@@ -0,0 +1,249 @@
+# In-memory catalog of stored names, indexed for cache-first generation
+
+import bisect
+import logging
+import random
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from phonetic import phonetic_keys, rank_sound_alikes
+
+logger = logging.getLogger(__name__)
+
+# Sorts after every character a spelling can contain; closes a prefix range
+PREFIX_UPPER_BOUND = "\U0010ffff"
+
+# Random draws per requested name before sample() falls back to walking its pool
+SAMPLE_DRAWS_PER_NAME = 8
+
+# Fields kept in memory for every catalog entry
+CATALOG_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "name": 1,
+    "gender": 1,
+    "origin": 1,
+    "meaning": 1,
+    "popularity_score": 1,
+    "image_url": 1,
+    "style": 1,
+}
+
+# Stored phonetic keys are read at load time but not kept on the entries
+LOAD_PROJECTION = {**CATALOG_PROJECTION, "phonetic_keys": 1}
+
+
+def _norm(value: Optional[str]) -> str:
+    return (value or "").strip().lower()
+
+
+def name_key(name: str, gender: str, origin: str) -> str:
+    # Canonical identity of a name: same spelling, gender and origin
+    return f"{_norm(name)}|{_norm(gender)}|{_norm(origin)}"
+
+
+class NameCatalog:
+    # Indexes names into id lists by gender and style for sampling, plus a sorted
+    # spelling index for prefix search and a phonetic key index for "sounds like"
+
+    def __init__(self):
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._ids_by_key: Dict[str, str] = {}
+        self._by_phonetic: Dict[str, Set[str]] = defaultdict(set)
+        # Id lists for random draws: every id under ("", ""), plus ("gender", g) and ("style", s)
+        self._id_lists: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        # Parallel lists ordered by (spelling, id); appended unsorted during load
+        self._spellings: List[str] = []
+        self._spelling_ids: List[str] = []
+        self._spellings_sorted = True
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    async def load(self, collection) -> int:
+        # Build the index from the names collection; the spelling index is sorted once at the end
+        self._spellings_sorted = False
+        try:
+            async for doc in collection.find({}, LOAD_PROJECTION):
+                self.add(doc)
+        finally:
+            self._sort_spellings()
+        self.loaded = True
+        logger.info(f"Name catalog loaded with {len(self)} names")
+        return len(self)
+
+    def add(self, doc: Dict[str, Any]) -> bool:
+        # Index a name document; duplicates of a known name are ignored
+        name_id = doc.get("id")
+        if not name_id or not doc.get("name"):
+            return False
+        key = name_key(doc["name"], doc.get("gender", ""), doc.get("origin", ""))
+        if name_id in self._docs or key in self._ids_by_key:
+            return False
+
+        entry = {field: doc.get(field) for field in CATALOG_PROJECTION if field != "_id"}
+        self._docs[name_id] = entry
+        self._ids_by_key[key] = name_id
+        for pool in (("", ""), ("gender", _norm(entry["gender"])), ("style", _norm(entry["style"]))):
+            self._id_lists[pool].append(name_id)
+        self._index_spelling(_norm(entry["name"]), name_id)
+        # Rows from before the phonetic backfill get their keys computed here
+        for key in doc.get("phonetic_keys") or phonetic_keys(entry["name"]):
+            self._by_phonetic[key].add(name_id)
+        return True
+
+    def _index_spelling(self, spelling: str, name_id: str):
+        if not self._spellings_sorted:
+            self._spellings.append(spelling)
+            self._spelling_ids.append(name_id)
+            return
+        # Among equal spellings, order by id
+        low = bisect.bisect_left(self._spellings, spelling)
+        high = bisect.bisect_right(self._spellings, spelling, low)
+        position = bisect.bisect_left(self._spelling_ids, name_id, low, high)
+        self._spellings.insert(position, spelling)
+        self._spelling_ids.insert(position, name_id)
+
+    def _sort_spellings(self):
+        if not self._spellings_sorted:
+            pairs = sorted(zip(self._spellings, self._spelling_ids))
+            self._spellings = [spelling for spelling, _ in pairs]
+            self._spelling_ids = [name_id for _, name_id in pairs]
+            self._spellings_sorted = True
+
+    def add_many(self, docs: Iterable[Dict[str, Any]]) -> int:
+        return sum(1 for doc in docs if self.add(doc))
+
+    def all_docs(self) -> List[Dict[str, Any]]:
+        # Every entry in insertion order; callers must not modify them
+        return list(self._docs.values())
+
+    def get(self, name_id: str) -> Optional[Dict[str, Any]]:
+        doc = self._docs.get(name_id)
+        return dict(doc) if doc else None
+
+    def update(self, name_id: str, fields: Dict[str, Any]):
+        # Keep non-indexed fields (e.g. image_url) in sync with the database
+        doc = self._docs.get(name_id)
+        if doc:
+            doc.update({k: v for k, v in fields.items() if k in ("meaning", "image_url")})
+
+    def search(
+        self,
+        prefix: str,
+        gender: Optional[str] = None,
+        origin: Optional[str] = None,
+        min_popularity: Optional[int] = None,
+        max_popularity: Optional[int] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        # Names starting with `prefix` (case-insensitive), alphabetically; the scan
+        # over the matching range stops as soon as `limit` names pass the filters
+        prefix = _norm(prefix)
+        if not prefix or not self._spellings_sorted:
+            return []
+        start = bisect.bisect_left(self._spellings, prefix)
+        end = bisect.bisect_left(self._spellings, prefix + PREFIX_UPPER_BOUND, start)
+
+        gender = _norm(gender) if gender else None
+        origin = _norm(origin) if origin else None
+        low = min_popularity if min_popularity is not None else 1
+        high = max_popularity if max_popularity is not None else 100
+
+        matches: List[Dict[str, Any]] = []
+        for position in range(start, end):
+            doc = self._docs[self._spelling_ids[position]]
+            if gender and _norm(doc["gender"]) != gender:
+                continue
+            if origin and _norm(doc["origin"]) != origin:
+                continue
+            if not low <= (doc.get("popularity_score") or 50) <= high:
+                continue
+            matches.append(dict(doc))
+            if len(matches) >= limit:
+                break
+        return matches
+
+    def sounds_like(self, name: str, gender: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        # Names sharing a phonetic key with `name`: a few hash lookups, no scan
+        shared: Dict[str, int] = defaultdict(int)
+        for key in phonetic_keys(name):
+            for name_id in self._by_phonetic.get(key, ()):
+                shared[name_id] += 1
+
+        gender = _norm(gender) if gender else None
+        candidates = [
+            (count, self._docs[name_id])
+            for name_id, count in shared.items()
+            if not gender or _norm(self._docs[name_id]["gender"]) == gender
+        ]
+        return [dict(doc) for doc in rank_sound_alikes(name, candidates, limit)]
+
+    def sample(
+        self,
+        count: int,
+        gender: Optional[str] = None,
+        style: Optional[str] = None,
+        exclude_names: Iterable[str] = (),
+    ) -> List[Dict[str, Any]]:
+        # Pick up to `count` random matches with distinct spellings. Ids are drawn at random
+        # from the smallest matching pool and checked against the other filter, so a hit costs
+        # about `count` lookups however large the catalog is. When draws stop finding names
+        # (few matches left), the pool is walked once from a random offset instead.
+        gender = _norm(gender) if gender else None
+        style = _norm(style) if style else None
+        pools = []
+        if gender:
+            pools.append(self._id_lists.get(("gender", gender), []))
+        if style:
+            pools.append(self._id_lists.get(("style", style), []))
+        pool = min(pools, key=len) if pools else self._id_lists.get(("", ""), [])
+
+        excluded = {_norm(n) for n in exclude_names}
+        seen: Set[str] = set()
+        picked: List[Dict[str, Any]] = []
+
+        def consider(name_id: str):
+            if name_id in seen:
+                return
+            seen.add(name_id)
+            doc = self._docs[name_id]
+            if gender and _norm(doc["gender"]) != gender:
+                return
+            if style and _norm(doc["style"]) != style:
+                return
+            spelling = _norm(doc["name"])
+            if spelling in excluded:
+                return
+            excluded.add(spelling)
+            picked.append(dict(doc))
+
+        size = len(pool)
+        for _ in range(count * SAMPLE_DRAWS_PER_NAME if size else 0):
+            if len(picked) >= count:
+                break
+            consider(pool[random.randrange(size)])
+        if len(picked) < count and size:
+            start = random.randrange(size)
+            for offset in range(size):
+                consider(pool[(start + offset) % size])
+                if len(picked) >= count:
+                    break
+
+        if len(picked) >= count:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return picked
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "size": len(self),
+            "phonetic_keys": len(self._by_phonetic),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,187 @@
+# Pre-generated name pools for hot (gender, style) buckets, refilled in the background
+
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Bucket = Tuple[str, str]
+
+# Spellings remembered per bucket after serving, as a multiple of target_size
+SERVED_HISTORY_ROUNDS = 5
+
+
+def bucket_key(gender: Optional[str], style: Optional[str]) -> Bucket:
+    return ((gender or "").strip().lower(), (style or "").strip().lower())
+
+
+def parse_buckets(value: str) -> List[Bucket]:
+    # "girl:modern,boy:modern,girl" -> [("girl", "modern"), ("boy", "modern"), ("girl", "")]
+    buckets = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        gender, _, style = item.partition(":")
+        buckets.append(bucket_key(gender, style))
+    return buckets
+
+
+class NamePoolManager:
+    # Each configured bucket keeps up to target_size unserved AI names. Taking names
+    # never waits on the model; once a pool drops below low_water the refill task is
+    # woken and tops it up in refill_batch-sized model calls. Recently served spellings
+    # are excluded from refills so a pool does not hand out the same names again.
+
+    def __init__(
+        self,
+        generate: Callable[[Optional[str], Optional[str], int, List[str]], Awaitable[List[Dict[str, Any]]]],
+        buckets: List[Bucket],
+        target_size: int = 30,
+        low_water: int = 10,
+        refill_batch: int = 10,
+        refill_interval: float = 30.0,
+    ):
+        self.generate = generate
+        self.target_size = target_size
+        self.low_water = low_water
+        self.refill_batch = refill_batch
+        self.refill_interval = refill_interval
+        self._pools: Dict[Bucket, Deque[Dict[str, Any]]] = {bucket: deque() for bucket in buckets}
+        self._served: Dict[Bucket, Deque[str]] = {
+            bucket: deque(maxlen=target_size * SERVED_HISTORY_ROUNDS) for bucket in buckets
+        }
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.names_served = 0
+        self.refills = 0
+        self.refill_errors = 0
+        self.names_generated = 0
+
+    @classmethod
+    def from_env(cls, generate) -> "NamePoolManager":
+        return cls(
+            generate,
+            buckets=parse_buckets(os.getenv("NAME_POOL_BUCKETS", "")),
+            target_size=int(os.getenv("NAME_POOL_SIZE", "30")),
+            low_water=int(os.getenv("NAME_POOL_LOW_WATER", "10")),
+            refill_batch=int(os.getenv("NAME_POOL_REFILL_BATCH", "10")),
+            refill_interval=float(os.getenv("NAME_POOL_REFILL_INTERVAL", "30")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._pools)
+
+    def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._refill_loop())
+
+    async def stop(self):
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def available(self, gender: Optional[str], style: Optional[str]) -> int:
+        pool = self._pools.get(bucket_key(gender, style))
+        return len(pool) if pool is not None else 0
+
+    def take(self, gender: Optional[str], style: Optional[str], count: int) -> List[Dict[str, Any]]:
+        # Up to `count` pooled names for this exact bucket; [] for buckets we do not pool
+        bucket = bucket_key(gender, style)
+        pool = self._pools.get(bucket)
+        if pool is None:
+            return []
+
+        taken = [pool.popleft() for _ in range(min(count, len(pool)))]
+        self._served[bucket].extend(doc["name"] for doc in taken)
+        if len(taken) >= count:
+            self.hits += 1
+        elif taken:
+            self.partial_hits += 1
+        else:
+            self.misses += 1
+        self.names_served += len(taken)
+
+        if len(pool) < self.low_water and self._wake is not None:
+            self._wake.set()
+        return taken
+
+    async def _refill_loop(self):
+        while not self._stopping:
+            for bucket in self._pools:
+                if len(self._pools[bucket]) < self.low_water:
+                    await self._refill(bucket)
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refill(self, bucket: Bucket):
+        # Top the pool up to target_size; stop at the first failed or unproductive call and
+        # retry next round
+        pool = self._pools[bucket]
+        served = self._served[bucket]
+        gender, style = bucket
+        while not self._stopping and len(pool) < self.target_size:
+            count = min(self.refill_batch, self.target_size - len(pool))
+            exclude = [doc["name"] for doc in pool] + list(dict.fromkeys(served))
+            try:
+                names = await self.generate(gender or None, style or None, count, exclude)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.refill_errors += 1
+                logger.warning(f"Refilling name pool {gender or '*'}/{style or '*'} failed: {e}")
+                return
+            if not names:
+                self.refill_errors += 1
+                return
+
+            # Skip spellings already waiting in the pool or recently served
+            pooled = {name.lower() for name in exclude}
+            before = len(pool)
+            for doc in names:
+                if doc["name"].lower() not in pooled:
+                    pooled.add(doc["name"].lower())
+                    pool.append(doc)
+            self.refills += 1
+            self.names_generated += len(names)
+            if len(pool) == before:
+                # Nothing new; the same prompt would likely be answered from cache again
+                self.refill_errors += 1
+                logger.warning(f"Refilling name pool {gender or '*'}/{style or '*'} added no new names")
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.hits + self.partial_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "target_size": self.target_size,
+            "low_water": self.low_water,
+            "refill_batch": self.refill_batch,
+            "refill_interval": self.refill_interval,
+            "pools": {f"{gender or '*'}/{style or '*'}": len(pool) for (gender, style), pool in self._pools.items()},
+            "hits": self.hits,
+            "partial_hits": self.partial_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 4) if requests else 0.0,
+            "names_served": self.names_served,
+            "refills": self.refills,
+            "refill_errors": self.refill_errors,
+            "names_generated": self.names_generated,
+        }
@@ -0,0 +1,65 @@
+# Batched, deduplicating persistence for generated names
+
+import logging
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from name_catalog import name_key
+from phonetic import phonetic_keys
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def canonicalize(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Attach name_key and phonetic keys, and drop repeats within the batch (first one wins)
+    seen = set()
+    unique = []
+    for doc in docs:
+        key = name_key(doc["name"], doc.get("gender", ""), doc.get("origin", ""))
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append({**doc, "name_key": key, "phonetic_keys": phonetic_keys(doc["name"])})
+    return unique
+
+
+async def persist_names(collection, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Upsert a batch in one unordered bulk write; names we already hold keep their stored id
+    batch = canonicalize(docs)
+    if not batch:
+        return []
+
+    ops = []
+    for doc in batch:
+        fields = {k: v for k, v in doc.items() if k != "name_key"}
+        ops.append(UpdateOne({"name_key": doc["name_key"]}, {"$setOnInsert": fields}, upsert=True))
+
+    try:
+        result = await collection.bulk_write(ops, ordered=False)
+        inserted = set(result.upserted_ids)
+    except BulkWriteError as e:
+        # Concurrent inserts of the same name lose the race on the unique index
+        errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != DUPLICATE_KEY_ERROR]
+        if errors:
+            raise
+        inserted = {item["index"] for item in e.details.get("upserted", [])}
+
+    existing_keys = [doc["name_key"] for i, doc in enumerate(batch) if i not in inserted]
+    stored: Dict[str, Dict[str, Any]] = {}
+    if existing_keys:
+        async for doc in collection.find({"name_key": {"$in": existing_keys}}, {"_id": 0}):
+            stored[doc["name_key"]] = doc
+
+    persisted = []
+    for i, doc in enumerate(batch):
+        if i in inserted:
+            persisted.append(doc)
+        elif doc["name_key"] in stored:
+            persisted.append(stored[doc["name_key"]])
+        else:
+            logger.warning(f"Name {doc['name']} was neither inserted nor found")
+    return persisted
@@ -0,0 +1,77 @@
+# bcrypt hashing off the event loop, in a bounded thread pool
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    # bcrypt releases the GIL while hashing, so a thread pool gives real parallelism.
+    # Pool size caps concurrent hashes; everything beyond it waits in the executor queue.
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        # pending and completed change on the event loop; the rest in worker threads, under _lock
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.max_pending = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+        self.hash_seconds = 0.0
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        queued_at = time.perf_counter()
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+
+        def timed():
+            started_at = time.perf_counter()
+            with self._lock:
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                finished_at = time.perf_counter()
+                with self._lock:
+                    self.running -= 1
+                    self.wait_seconds += started_at - queued_at
+                    self.hash_seconds += finished_at - started_at
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt())
+        return hashed.decode("utf-8")
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            running, wait_seconds, hash_seconds = self.running, self.wait_seconds, self.hash_seconds
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.pending,
+            "running": running,
+            "max_queue_depth": self.max_pending,
+            "completed": self.completed,
+            "avg_wait_ms": round(wait_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+            "avg_hash_ms": round(hash_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,176 @@
+# Phonetic keys for "sounds like" lookups: Soundex, a simplified Metaphone, and a rhyme key
+
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Tuple
+
+VOWELS = set("AEIOU")
+FRONT_VOWELS = set("EIY")
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"),
+    **dict.fromkeys("CGJKQSXZ", "2"),
+    **dict.fromkeys("DT", "3"),
+    "L": "4",
+    **dict.fromkeys("MN", "5"),
+    "R": "6",
+}
+
+# Silent first letters: "Knox", "Gnome", "Psyche", "Wren"
+INITIAL_SILENT = ("KN", "GN", "PN", "WR", "PS")
+
+
+def _letters(word: str) -> str:
+    # "José" -> "JOSE": drop accents, then anything that is not a letter
+    decomposed = unicodedata.normalize("NFKD", word or "")
+    return re.sub(r"[^A-Z]", "", decomposed.upper())
+
+
+def soundex(word: str) -> str:
+    # American Soundex: first letter plus three digits; H and W do not separate equal codes
+    letters = _letters(word)
+    if not letters:
+        return ""
+    code = letters[0]
+    previous = SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in "HW":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def metaphone(word: str) -> str:
+    # Simplified Metaphone; like Double Metaphone, every initial vowel encodes as "A"
+    letters = _letters(word)
+    if not letters:
+        return ""
+    if letters[:2] in INITIAL_SILENT:
+        letters = letters[1:]
+    elif letters[0] == "X":
+        letters = "S" + letters[1:]
+    elif letters[:2] == "WH":
+        letters = "W" + letters[2:]
+
+    # Doubled letters sound once; CC is left to the C rules
+    letters = re.sub(r"([^C])\1+", r"\1", letters)
+
+    code = []
+    length = len(letters)
+    for i, letter in enumerate(letters):
+        prev = letters[i - 1] if i > 0 else ""
+        nxt = letters[i + 1] if i + 1 < length else ""
+        after = letters[i + 2] if i + 2 < length else ""
+
+        if letter in VOWELS:
+            if i == 0:
+                code.append("A")
+        elif letter == "B":
+            if not (prev == "M" and i == length - 1):
+                code.append("B")
+        elif letter == "C":
+            if nxt == "H":
+                # "Schuyler", and "Chloe"/"Christopher" where CH precedes a consonant
+                code.append("K" if prev == "S" or (i == 0 and after and after not in VOWELS) else "X")
+            elif nxt == "I" and after == "A":
+                code.append("X")
+            elif nxt in FRONT_VOWELS:
+                if prev != "S":
+                    code.append("S")
+            else:
+                code.append("K")
+        elif letter == "D":
+            code.append("J" if nxt == "G" and after in FRONT_VOWELS else "T")
+        elif letter == "G":
+            if nxt == "H" and after and after not in VOWELS:
+                continue
+            if nxt == "N" and (i + 2 == length or letters[i + 2:] == "ED"):
+                continue
+            if prev == "D" and nxt in FRONT_VOWELS:
+                continue
+            code.append("J" if nxt in FRONT_VOWELS else "K")
+        elif letter == "H":
+            if (not prev or prev not in "CSPTG") and nxt in VOWELS:
+                code.append("H")
+        elif letter == "K":
+            if prev != "C":
+                code.append("K")
+        elif letter == "P":
+            code.append("F" if nxt == "H" else "P")
+        elif letter == "Q":
+            code.append("K")
+        elif letter == "S":
+            if nxt == "H" or (nxt == "I" and after in ("O", "A")):
+                code.append("X")
+            else:
+                code.append("S")
+        elif letter == "T":
+            if nxt == "I" and after in ("O", "A"):
+                code.append("X")
+            elif nxt == "H":
+                code.append("0")
+            elif not (nxt == "C" and after == "H"):
+                code.append("T")
+        elif letter == "V":
+            code.append("F")
+        elif letter in "WY":
+            if nxt in VOWELS:
+                code.append(letter)
+        elif letter == "X":
+            code.append("KS")
+        elif letter == "Z":
+            code.append("S")
+        else:
+            # F, J, L, M, N, R
+            code.append(letter)
+    return "".join(code)
+
+
+def rhyme_key(word: str) -> str:
+    # Metaphone of the name from its first vowel on: Aiden, Jaden and Braden share one.
+    # Endings with no consonant ("Mia", "Zoe") would match too much and get no key.
+    letters = _letters(word)
+    match = re.search(r"[AEIOUY]", letters[1:]) if letters else None
+    if letters and letters[0] not in VOWELS and match:
+        letters = letters[match.start() + 1:]
+    key = metaphone(letters)
+    return key if len(key) > 1 else ""
+
+
+def phonetic_keys(name: str) -> List[str]:
+    # Prefixed so all three kinds can share one index
+    keys = []
+    for prefix, key in (("S", soundex(name)), ("M", metaphone(name)), ("R", rhyme_key(name))):
+        if key:
+            keys.append(f"{prefix}:{key}")
+    return keys
+
+
+def rank_sound_alikes(
+    name: str,
+    candidates: Iterable[Tuple[int, Dict[str, Any]]],
+    limit: int,
+) -> List[Dict[str, Any]]:
+    # (shared key count, doc) pairs -> most shared keys first, then most popular;
+    # one result per spelling, never the name itself
+    spelling = (name or "").strip().lower()
+    ranked = sorted(
+        candidates,
+        key=lambda item: (item[0], item[1].get("popularity_score") or 0, item[1]["id"]),
+        reverse=True,
+    )
+    seen = {spelling}
+    results = []
+    for _, doc in ranked:
+        doc_spelling = doc["name"].strip().lower()
+        if doc_spelling in seen:
+            continue
+        seen.add(doc_spelling)
+        results.append(doc)
+        if len(results) >= limit:
+            break
+    return results
@@ -0,0 +1,188 @@
+# "More like my favorites": hashed character n-gram / origin / gender features for every
+# catalog name in NumPy arrays, scored against a user's favorites in one batched pass.
+# Imported lazily by the server so NumPy stays out of the startup import graph.
+
+import os
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+NGRAM_SIZES = (2, 3)
+GENDERS = ("boy", "girl", "unisex")
+
+
+def _bucket(token: str, dims: int) -> Tuple[int, float]:
+    # Feature hashing with a sign bit, so colliding n-grams tend to cancel instead of pile up
+    digest = zlib.crc32(token.encode("utf-8"))
+    return digest % dims, (1.0 if digest & 0x80000000 else -1.0)
+
+
+def _ngrams(name: str) -> List[str]:
+    padded = f"^{(name or '').strip().lower()}$"
+    return [padded[i:i + n] for n in NGRAM_SIZES for i in range(len(padded) - n + 1)]
+
+
+class NameRecommender:
+    # The n-gram block is a dense float32 matrix. Origin and gender are one-hot, so those
+    # columns are kept as one small code per row and scored with a gather, which gives the
+    # same scores as the full matrix at a fraction of the memory traffic. Rows are appended
+    # as names arrive; capacity doubles so adds stay amortized O(1).
+
+    def __init__(
+        self,
+        ngram_dims: int = 64,
+        origin_weight: float = 0.5,
+        gender_weight: float = 0.5,
+        initial_capacity: int = 1024,
+    ):
+        self.ngram_dims = ngram_dims
+        self.origin_weight = origin_weight
+        self.gender_weight = gender_weight
+        self._matrix = np.zeros((initial_capacity, ngram_dims), dtype=np.float32)
+        # Code 0 means unknown; origins get codes in order of first appearance
+        self._origins = np.zeros(initial_capacity, dtype=np.int32)
+        self._genders = np.zeros(initial_capacity, dtype=np.int8)
+        self._origin_codes: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._spellings: List[str] = []
+        self._rows: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "NameRecommender":
+        return cls(
+            ngram_dims=int(os.getenv("RECOMMENDATION_NGRAM_DIMS", "64")),
+            origin_weight=float(os.getenv("RECOMMENDATION_ORIGIN_WEIGHT", "0.5")),
+            gender_weight=float(os.getenv("RECOMMENDATION_GENDER_WEIGHT", "0.5")),
+        )
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, name_id: str) -> bool:
+        return name_id in self._rows
+
+    def vectorize(self, name: str, out: Optional[np.ndarray] = None) -> np.ndarray:
+        # L2-normalized signed counts of hashed character 2- and 3-grams
+        vector = out if out is not None else np.zeros(self.ngram_dims, dtype=np.float32)
+        for gram in _ngrams(name):
+            index, sign = _bucket(gram, self.ngram_dims)
+            vector[index] += sign
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector
+
+    def _origin_code(self, origin: Optional[str], create: bool) -> int:
+        origin = (origin or "").strip().lower()
+        if not origin:
+            return 0
+        code = self._origin_codes.get(origin)
+        if code is None and create:
+            code = self._origin_codes[origin] = len(self._origin_codes) + 1
+        return code or 0
+
+    @staticmethod
+    def _gender_code(gender: Optional[str]) -> int:
+        gender = (gender or "").strip().lower()
+        return GENDERS.index(gender) + 1 if gender in GENDERS else 0
+
+    def _reserve(self, rows: int):
+        capacity = self._matrix.shape[0]
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        size = len(self)
+        matrix = np.zeros((capacity, self.ngram_dims), dtype=np.float32)
+        matrix[:size] = self._matrix[:size]
+        origins = np.zeros(capacity, dtype=np.int32)
+        origins[:size] = self._origins[:size]
+        genders = np.zeros(capacity, dtype=np.int8)
+        genders[:size] = self._genders[:size]
+        self._matrix, self._origins, self._genders = matrix, origins, genders
+
+    def add(self, docs: Iterable[Dict[str, Any]]) -> int:
+        # Append rows for names not indexed yet; returns how many were added
+        new_docs = []
+        for doc in docs:
+            name_id = doc.get("id")
+            if name_id and doc.get("name") and name_id not in self._rows:
+                self._rows[name_id] = -1  # claimed; repeats within the batch are skipped
+                new_docs.append(doc)
+        if not new_docs:
+            return 0
+
+        start = len(self)
+        self._reserve(start + len(new_docs))
+        for offset, doc in enumerate(new_docs):
+            row = start + offset
+            self.vectorize(doc["name"], out=self._matrix[row])
+            self._origins[row] = self._origin_code(doc.get("origin"), create=True)
+            self._genders[row] = self._gender_code(doc.get("gender"))
+            self._rows[doc["id"]] = row
+            self._ids.append(doc["id"])
+            self._spellings.append(doc["name"].strip().lower())
+        return len(new_docs)
+
+    def recommend(
+        self,
+        favorites: Sequence[Dict[str, Any]],
+        limit: int = 20,
+        gender: Optional[str] = None,
+    ) -> List[Tuple[str, float]]:
+        # Score every row against the favorites' mean feature vector: one matrix-vector
+        # product for the n-grams plus two gathers for origin and gender, then the top
+        # `limit` by argpartition. Favorites and their spellings are skipped.
+        size = len(self)
+        if not favorites or not size:
+            return []
+        ngram_profile = np.mean([self.vectorize(doc.get("name", "")) for doc in favorites], axis=0)
+        origin_profile = np.zeros(len(self._origin_codes) + 1, dtype=np.float32)
+        gender_profile = np.zeros(len(GENDERS) + 1, dtype=np.float32)
+        for doc in favorites:
+            origin_profile[self._origin_code(doc.get("origin"), create=False)] += self.origin_weight
+            gender_profile[self._gender_code(doc.get("gender"))] += self.gender_weight
+        # Code 0 (unknown) never scores
+        origin_profile[0] = gender_profile[0] = 0
+        origin_profile /= len(favorites)
+        gender_profile /= len(favorites)
+
+        scores = self._matrix[:size] @ ngram_profile.astype(np.float32)
+        scores += origin_profile[self._origins[:size]]
+        scores += gender_profile[self._genders[:size]]
+
+        if gender and self._gender_code(gender):
+            scores[self._genders[:size] != self._gender_code(gender)] = -np.inf
+        excluded_ids = {doc.get("id") for doc in favorites}
+        for name_id in excluded_ids:
+            row = self._rows.get(name_id, -1)
+            if row >= 0:
+                scores[row] = -np.inf
+
+        # Over-fetch so dropping favorite spellings from other origins still leaves `limit`
+        excluded_spellings = {(doc.get("name") or "").strip().lower() for doc in favorites}
+        k = min(size, limit + len(excluded_ids) + len(excluded_spellings))
+        top = np.argpartition(scores, size - k)[size - k:]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        results = []
+        for row in top:
+            score = float(scores[row])
+            if score == -np.inf:
+                break
+            if self._spellings[row] in excluded_spellings:
+                continue
+            results.append((self._ids[row], score))
+            if len(results) >= limit:
+                break
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        arrays = (self._matrix, self._origins, self._genders)
+        return {
+            "size": len(self),
+            "ngram_dims": self.ngram_dims,
+            "origins": len(self._origin_codes),
+            "memory_mb": round(sum(array.nbytes for array in arrays) / 2**20, 1),
+        }
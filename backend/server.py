@@ -1,23 +1,55 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse, JSONResponse, ORJSONResponse, PlainTextResponse
 from dotenv import load_dotenv
+from starlette.background import BackgroundTask
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+import asyncio
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import uuid
+import json
+import orjson
+import re
 from datetime import datetime, timedelta
 import hashlib
 import secrets
-import bcrypt
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import Depends, HTTPException, status
 import jwt
 
 # AI agents
-from ai_agents.agents import AgentConfig, SearchAgent, ChatAgent
+from ai_agents.config import AgentConfig
+from ai_agents.cache import response_cache
+from ai_agents.registry import AgentRegistry
+from ai_agents.singleflight import SingleFlight, llm_singleflight
+from ai_agents.scheduler import Priority, QueueFullError, llm_scheduler
+
+# Name catalog
+from name_catalog import NameCatalog
+from phonetic import phonetic_keys, rank_sound_alikes
+from json_stream import JSONArrayStreamParser
+from name_store import persist_names
+from migrations import run_migrations, check_query_plans, sync_image_job_retention, sync_status_retention
+from password_hashing import PasswordHasher
+from auth_cache import AuthCache, USER_IDENTITY_PROJECTION
+from share_snapshots import ShareSnapshotCache, page_snapshot
+from name_batcher import NameBatchItem, NameGenerationFailed, NameRequestBatcher, parse_batch_sections
+from image_jobs import ImageJobQueue
+from image_cache import ImageCache
+from name_pools import NamePoolManager
+from status_checks import apply_cursor, encode_cursor, naive_utc, parse_interval, status_filter, summary_pipeline, summary_window
+
+# Metrics
+from ai_agents.instrumentation import add_llm_observer
+import metrics
+from metrics import MetricsMiddleware, MongoCommandMetrics
+
+add_llm_observer(metrics.observe_llm_call)
 
 
 ROOT_DIR = Path(__file__).parent
@@ -25,18 +57,25 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandMetrics()])
 db = client[os.environ['DB_NAME']]
 
 # AI agents init
 agent_config = AgentConfig()
-search_agent: Optional[SearchAgent] = None
-chat_agent: Optional[ChatAgent] = None
+agent_registry = AgentRegistry(agent_config)
+name_singleflight = SingleFlight()
+
+# Stored names answer generation requests before the LLM does
+name_catalog = NameCatalog()
+NAME_CATALOG_ENABLED = os.getenv("NAME_CATALOG_ENABLED", "true").lower() == "true"
 
 # Auth configuration
 JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
 JWT_ALGORITHM = "HS256"
 security = HTTPBearer()
+password_hasher = PasswordHasher()
+auth_cache = AuthCache()
+share_cache = ShareSnapshotCache()
 
 # Main app
 app = FastAPI(title="AI Agents API", description="Minimal AI Agents API with LangGraph and MCP support")
@@ -85,12 +124,16 @@ class Name(BaseModel):
     meaning: str
     popularity_score: int = Field(default=50, ge=1, le=100)
     image_url: Optional[str] = None
+    style: Optional[str] = None  # Style requested when the name was generated
 
 class NameRequest(BaseModel):
     gender: Optional[str] = None  # "boy", "girl", "unisex", or None for all
     count: int = Field(default=10, ge=1, le=50)
     style: Optional[str] = None  # "traditional", "modern", "unique", etc.
 
+class FavoritesBulkRequest(BaseModel):
+    name_ids: List[str] = Field(..., min_length=1, max_length=500)
+
 class FavoritesList(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
@@ -98,6 +141,9 @@ class FavoritesList(BaseModel):
     share_token: str = Field(default_factory=lambda: secrets.token_urlsafe(32))
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    names: List[dict] = Field(default_factory=list)  # Denormalized name documents, sorted by id
+    version: int = 1
+    favorites_version: int = 0  # users.favorites_version the snapshot was built from
 
 # AI agent models
 class ChatRequest(BaseModel):
@@ -131,17 +177,23 @@ class SearchResponse(BaseModel):
 class ImageGenerationRequest(BaseModel):
     name_id: str
 
-class ImageGenerationResponse(BaseModel):
-    success: bool
+class ImageJob(BaseModel):
+    id: str
+    name_id: str
+    status: str  # "queued", "running", "done" or "failed"
     image_url: Optional[str] = None
     error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
 
 # Helper functions
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+async def hash_password(password: str) -> str:
+    with metrics.password_hash_seconds.time("hash"):
+        return await password_hasher.hash(password)
 
-def verify_password(password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+async def verify_password(password: str, hashed_password: str) -> bool:
+    with metrics.password_hash_seconds.time("verify"):
+        return await password_hasher.verify(password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -159,19 +211,31 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
+    token = credentials.credentials
+    user_id = auth_cache.get_user_id(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+            user_id: str = payload.get("sub")
+            if user_id is None:
+                raise credentials_exception
+        except jwt.PyJWTError:
             raise credentials_exception
-    except jwt.PyJWTError:
-        raise credentials_exception
+        auth_cache.set_token(token, user_id, payload.get("exp"))
 
-    user = await db.users.find_one({"id": user_id})
+    user = auth_cache.get_user(user_id)
     if user is None:
-        raise credentials_exception
+        user = await db.users.find_one({"id": user_id}, USER_IDENTITY_PROJECTION)
+        if user is None:
+            raise credentials_exception
+        auth_cache.set_user(user_id, user)
+    # Favorites are not part of the cached identity; routes read them with load_favorites()
     return User(**user)
 
+async def load_favorites(user_id: str) -> List[str]:
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "favorites": 1})
+    return (user or {}).get("favorites", [])
+
 # Routes
 @api_router.get("/")
 async def root():
@@ -184,10 +248,76 @@ async def create_status_check(input: StatusCheckCreate):
     _ = await db.status_checks.insert_one(status_obj.dict())
     return status_obj
 
+MAX_STATUS_PAGE_SIZE = 1000
+STATUS_EXPORT_BATCH_SIZE = int(os.getenv("STATUS_EXPORT_BATCH_SIZE", "1000"))
+
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(
+    limit: int = Query(MAX_STATUS_PAGE_SIZE, ge=1, le=MAX_STATUS_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    client_name: Optional[str] = None
+):
+    """Get status checks, newest first, one page at a time"""
+    query = status_filter(client_name)
+    if cursor:
+        try:
+            query = apply_cursor(query, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # Documents were validated by StatusCheck when written; encode them as stored
+    docs = await db.status_checks.find(query, {"_id": 0}).sort(
+        [("timestamp", -1), ("id", -1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    headers = {}
+    if len(docs) > limit:
+        docs = docs[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(docs[-1])
+    return ORJSONResponse(docs, headers=headers)
+
+@api_router.get("/status/summary")
+async def get_status_summary(
+    interval: str = "1h",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    client_name: Optional[str] = None
+):
+    """Count status checks per client and time bucket"""
+    try:
+        interval_seconds = parse_interval(interval)
+        since, until = summary_window(interval_seconds, naive_utc(since), naive_utc(until))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Grouped in Mongo; only one row per client and bucket comes back
+    pipeline = summary_pipeline(status_filter(client_name, since, until), interval_seconds)
+    buckets = await db.status_checks.aggregate(pipeline).to_list(None)
+    return ORJSONResponse({
+        "interval_seconds": interval_seconds,
+        "since": since,
+        "until": until,
+        "buckets": buckets
+    })
+
+async def stream_ndjson(cursor):
+    async for doc in cursor:
+        yield orjson.dumps(doc, option=orjson.OPT_APPEND_NEWLINE)
+
+@api_router.get("/status/export")
+async def export_status_checks(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    client_name: Optional[str] = None
+):
+    """Stream raw status checks as NDJSON, oldest first"""
+    cursor = db.status_checks.find(
+        status_filter(client_name, naive_utc(since), naive_utc(until)), {"_id": 0}
+    ).sort([("timestamp", 1), ("id", 1)]).batch_size(STATUS_EXPORT_BATCH_SIZE)
+    return StreamingResponse(
+        stream_ndjson(cursor),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="status_checks.ndjson"'}
+    )
 
 
 # Authentication routes
@@ -199,7 +329,7 @@ async def register_user(user_data: UserCreate):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     user = User(
         email=user_data.email,
         hashed_password=hashed_password
@@ -217,7 +347,7 @@ async def register_user(user_data: UserCreate):
 async def login_user(user_data: UserLogin):
     # Find user
     user_doc = await db.users.find_one({"email": user_data.email})
-    if not user_doc or not verify_password(user_data.password, user_doc["hashed_password"]):
+    if not user_doc or not await verify_password(user_data.password, user_doc["hashed_password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # Create access token
@@ -234,27 +364,21 @@ async def login_user(user_data: UserLogin):
         )
     }
 
-# Name generation routes
-@api_router.post("/names/generate", response_model=List[Name])
-async def generate_names(request: NameRequest):
-    """Generate baby names using AI"""
-    global chat_agent
-
-    try:
-        # Initialize chat agent if needed
-        if chat_agent is None:
-            chat_agent = ChatAgent(agent_config)
+# Name generation helpers
+def build_names_prompt(request: NameRequest, count: int, exclude: List[str] = ()) -> str:
+    gender_filter = ""
+    if request.gender:
+        gender_filter = f" for {request.gender}s"
 
-        # Build prompt based on request parameters
-        gender_filter = ""
-        if request.gender:
-            gender_filter = f" for {request.gender}s"
+    style_filter = ""
+    if request.style:
+        style_filter = f" in {request.style} style"
 
-        style_filter = ""
-        if request.style:
-            style_filter = f" in {request.style} style"
+    exclude_filter = ""
+    if exclude:
+        exclude_filter = f"\n        Do not include any of these names: {', '.join(exclude)}."
 
-        prompt = f"""Generate {request.count} baby names{gender_filter}{style_filter}.
+    return f"""Generate {count} baby names{gender_filter}{style_filter}.{exclude_filter}
         For each name, provide:
         - name: the actual name
         - gender: "boy", "girl", or "unisex"
@@ -264,190 +388,666 @@ async def generate_names(request: NameRequest):
 
         Return only a JSON array of objects with these fields. No additional text."""
 
-        # Get AI response
-        result = await chat_agent.execute(prompt)
+def name_from_data(name_data: dict, style: Optional[str] = None) -> Name:
+    return Name(
+        name=name_data.get("name", "Unknown"),
+        gender=name_data.get("gender", "unisex"),
+        origin=name_data.get("origin", "Unknown"),
+        meaning=name_data.get("meaning", "Unknown"),
+        popularity_score=name_data.get("popularity_score", 50),
+        style=style
+    )
+
+async def fallback_names(request: NameRequest) -> List[Name]:
+    metrics.fallbacks.inc("sample_names")
+    sample_names = [
+        Name(name="Emma", gender="girl", origin="Germanic", meaning="Universal", popularity_score=95),
+        Name(name="Liam", gender="boy", origin="Irish", meaning="Strong-willed warrior", popularity_score=92),
+        Name(name="Olivia", gender="girl", origin="Latin", meaning="Olive tree", popularity_score=88),
+        Name(name="Noah", gender="boy", origin="Hebrew", meaning="Rest, comfort", popularity_score=85),
+        Name(name="Ava", gender="girl", origin="Latin", meaning="Life", popularity_score=82)
+    ]
+
+    # Store sample names and return subset based on request
+    filtered_names = [
+        name for name in sample_names
+        if not request.gender or name.gender == request.gender or name.gender == "unisex"
+    ]
+    return await store_names(filtered_names[:request.count])
+
+async def store_names(names: List[Name]) -> List[Name]:
+    # Persist in one bulk upsert; names we already hold come back with their stored id
+    persisted = await persist_names(db.names, [name.dict() for name in names])
+    name_catalog.add_many(persisted)
+    if recommender is not None:
+        recommender.add(persisted)
+    return [Name(**doc) for doc in persisted]
+
+def catalog_names(request: NameRequest, count: Optional[int] = None, exclude: List[str] = ()) -> List[Name]:
+    # Serve as much of the request as possible from stored names
+    if not NAME_CATALOG_ENABLED or not name_catalog.loaded:
+        return []
+    docs = name_catalog.sample(
+        request.count if count is None else count,
+        gender=request.gender,
+        style=request.style,
+        exclude_names=exclude
+    )
+    return [Name(**doc) for doc in docs]
+
+def names_ready(request: NameRequest) -> bool:
+    # Whether the pool and catalog look able to cover the request; takes nothing
+    pooled = name_pools.available(request.gender, request.style)
+    if pooled >= request.count:
+        return True
+    return len(catalog_names(request, request.count - pooled)) >= request.count - pooled
+
+def ready_names(request: NameRequest) -> List[Name]:
+    # Names available without a model call: fresh pooled names first, then the catalog
+    names = [Name(**doc) for doc in name_pools.take(request.gender, request.style, request.count)]
+    if len(names) < request.count:
+        names += catalog_names(request, request.count - len(names), exclude=[n.name for n in names])
+    return names
+
+async def produce_names(request: NameRequest) -> List[Name]:
+    # Pool and catalog first, then the model for the shortfall
+    cached_names = ready_names(request)
+    shortfall = request.count - len(cached_names)
+    if shortfall <= 0:
+        return cached_names
+
+    # Only ask the model for names the catalog could not supply
+    item = NameBatchItem(
+        count=shortfall,
+        gender=request.gender,
+        style=request.style,
+        exclude=[n.name for n in cached_names]
+    )
+    try:
+        if name_batcher is not None:
+            names_data = await name_batcher.submit(item)
+        else:
+            names_data = await request_name_data(item)
+    except NameGenerationFailed:
+        if cached_names:
+            metrics.fallbacks.inc("stored_names_only")
+            return cached_names
+        raise HTTPException(status_code=500, detail="Failed to generate names")
+
+    if names_data is None:
+        if cached_names:
+            metrics.fallbacks.inc("stored_names_only")
+            return cached_names
+
+        # Fallback: create some sample names if AI response isn't valid JSON
+        return await fallback_names(request)
+
+    names = [name_from_data(name_data, style=request.style) for name_data in names_data]
+
+    # Store in database for future reference
+    seen_ids = {name.id for name in cached_names}
+    names = [name for name in await store_names(names) if name.id not in seen_ids]
+
+    return cached_names + names[:shortfall]
+
+async def execute_names_prompt(
+    prompt: str,
+    priority: Priority = Priority.INTERACTIVE,
+    cache_if=None,
+    use_cache: bool = True
+):
+    chat_agent = await agent_registry.get("chat")
+    return await chat_agent.execute(
+        prompt, endpoint="names", priority=priority, cache_if=cache_if, use_cache=use_cache
+    )
 
-        if not result.success:
-            raise HTTPException(status_code=500, detail="Failed to generate names")
+async def execute_batch_prompt(prompt: str):
+    # Only replies with at least one usable section are worth caching
+    return await execute_names_prompt(prompt, cache_if=lambda content: bool(parse_batch_sections(content)))
 
-        # Try to parse AI response as JSON
-        import json
-        try:
-            names_data = json.loads(result.content)
-            names = []
-            for name_data in names_data:
-                name = Name(
-                    name=name_data.get("name", "Unknown"),
-                    gender=name_data.get("gender", "unisex"),
-                    origin=name_data.get("origin", "Unknown"),
-                    meaning=name_data.get("meaning", "Unknown"),
-                    popularity_score=name_data.get("popularity_score", 50)
-                )
-                names.append(name)
-                # Store in database for future reference
-                await db.names.insert_one(name.dict())
-
-            return names
-        except json.JSONDecodeError:
-            # Fallback: create some sample names if AI response isn't valid JSON
-            sample_names = [
-                Name(name="Emma", gender="girl", origin="Germanic", meaning="Universal", popularity_score=95),
-                Name(name="Liam", gender="boy", origin="Irish", meaning="Strong-willed warrior", popularity_score=92),
-                Name(name="Olivia", gender="girl", origin="Latin", meaning="Olive tree", popularity_score=88),
-                Name(name="Noah", gender="boy", origin="Hebrew", meaning="Rest, comfort", popularity_score=85),
-                Name(name="Ava", gender="girl", origin="Latin", meaning="Life", popularity_score=82)
-            ]
-
-            # Store sample names and return subset based on request
-            filtered_names = []
-            for name in sample_names:
-                if len(filtered_names) >= request.count:
-                    break
-                if not request.gender or name.gender == request.gender or name.gender == "unisex":
-                    await db.names.insert_one(name.dict())
-                    filtered_names.append(name)
-
-            return filtered_names[:request.count]
+def parse_names_reply(content: str) -> Optional[List[dict]]:
+    # None when the reply is not a JSON array of names
+    try:
+        names_data = json.loads(content)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(names_data, list) or not all(isinstance(entry, dict) for entry in names_data):
+        return None
+    return names_data
+
+def is_names_reply(content: str) -> bool:
+    return parse_names_reply(content) is not None
+
+async def request_name_data(
+    item: NameBatchItem,
+    priority: Priority = Priority.INTERACTIVE,
+    use_cache: bool = True
+) -> Optional[List[dict]]:
+    # One model call for one request; None when the reply is not a JSON array of names
+    request = NameRequest(gender=item.gender, style=item.style, count=item.count)
+    prompt = build_names_prompt(request, item.count, exclude=item.exclude)
+    result = await execute_names_prompt(prompt, priority, cache_if=is_names_reply, use_cache=use_cache)
+    if not result.success:
+        raise NameGenerationFailed(result.error or "Failed to generate names")
+    with metrics.parse_seconds.time("names_json"):
+        return parse_names_reply(result.content)
+
+# Optional micro-batching: requests arriving within the window share one model call
+NAME_BATCH_WINDOW_MS = float(os.getenv("NAME_BATCH_WINDOW_MS", "0"))
+name_batcher = NameRequestBatcher(
+    execute_batch_prompt,
+    request_name_data,
+    window_ms=NAME_BATCH_WINDOW_MS,
+    max_batch=int(os.getenv("NAME_BATCH_MAX_SIZE", "8"))
+) if NAME_BATCH_WINDOW_MS > 0 else None
+
+async def generate_pool_names(gender: Optional[str], style: Optional[str], count: int, exclude: List[str]) -> List[dict]:
+    # Refill step for the name pools; runs behind interactive requests. A refill wants new
+    # names, so it never takes a cached reply: that would put names already served back in.
+    names_data = await request_name_data(
+        NameBatchItem(count=count, gender=gender, style=style, exclude=exclude),
+        priority=Priority.BACKGROUND,
+        use_cache=False
+    )
+    if not names_data:
+        return []
+    names = await store_names([name_from_data(name_data, style=style) for name_data in names_data])
+    return [name.dict() for name in names]
 
+# Hot (gender, style) buckets answered from pre-generated names, e.g. NAME_POOL_BUCKETS="girl:modern,boy:modern"
+name_pools = NamePoolManager.from_env(generate_pool_names)
+
+def name_request_key(request: NameRequest) -> tuple:
+    return ((request.gender or "").lower(), (request.style or "").strip().lower(), request.count)
+
+# Name generation routes
+@api_router.post("/names/generate", response_model=List[Name])
+async def generate_names(request: NameRequest):
+    """Generate baby names using AI"""
+    try:
+        # Identical requests arriving together share one generation; each gets its own copy
+        return await name_singleflight.do(
+            name_request_key(request),
+            lambda: produce_names(request),
+            copy_result=lambda names: [name.model_copy() for name in names]
+        )
+
+    except QueueFullError:
+        raise
     except Exception as e:
         logger.error(f"Error generating names: {e}")
+        metrics.errors.inc("generate_names")
         raise HTTPException(status_code=500, detail=f"Error generating names: {str(e)}")
 
-@api_router.post("/names/{name_id}/generate-image", response_model=ImageGenerationResponse)
-async def generate_name_image(name_id: str, current_user: User = Depends(get_current_user)):
-    """Generate an artistic image for a given name"""
+def format_stream_event(payload: dict, event: str, sse: bool) -> str:
+    data = json.dumps(payload, default=str)
+    if sse:
+        return f"event: {event}\ndata: {data}\n\n"
+    return data + "\n"
+
+def is_streamed_names_reply(content: str) -> bool:
+    # The stream parser tolerates prose and fences, so the cached reply only needs one name
+    return bool(JSONArrayStreamParser().feed(content))
+
+@api_router.post("/names/generate/stream")
+async def generate_names_stream(request: NameRequest, http_request: Request, format: Optional[str] = None):
+    """Stream generated names as NDJSON (or SSE) as soon as each one is complete"""
+    sse = format == "sse" or "text/event-stream" in http_request.headers.get("accept", "")
+
+    # Names the pools and catalog can serve never touch the model. For the rest, a model
+    # slot (or queue place) is reserved before the 200 response starts, so backpressure is
+    # a 429 rather than an error event; pooled names are only taken once that has passed.
+    chat_agent = await agent_registry.get("chat")
+    reservation = None
+    if not names_ready(request):
+        reservation = chat_agent.reserve_slot("names", Priority.INTERACTIVE)
     try:
-        # Get the name from database
-        name_doc = await db.names.find_one({"id": name_id})
-        if not name_doc:
-            raise HTTPException(status_code=404, detail="Name not found")
-
-        name_obj = Name(**name_doc)
+        cached_names = ready_names(request)
+    except Exception:
+        if reservation is not None:
+            chat_agent.release_slot(reservation)
+        raise
+    wanted = request.count
+    if len(cached_names) < wanted and reservation is None:
+        try:
+            reservation = chat_agent.reserve_slot("names", Priority.INTERACTIVE)
+        except QueueFullError:
+            if not cached_names:
+                raise
+            # The names are already taken; serve them rather than drop them
+            metrics.fallbacks.inc("stored_names_only")
+            wanted = len(cached_names)
+
+    async def events():
+        emitted = 0
+        emitted_ids = set()
+        try:
+            for name in cached_names:
+                emitted += 1
+                emitted_ids.add(name.id)
+                yield format_stream_event(name.dict(), "name", sse)
+
+            shortfall = wanted - emitted
+            if shortfall > 0:
+                prompt = build_names_prompt(request, shortfall, exclude=[n.name for n in cached_names])
+                parser = JSONArrayStreamParser()
+                generated = 0
+                chunks = chat_agent.stream(
+                    prompt,
+                    endpoint="names",
+                    priority=Priority.INTERACTIVE,
+                    cache_if=is_streamed_names_reply,
+                    reservation=reservation
+                )
+                try:
+                    async for chunk in chunks:
+                        with metrics.parse_seconds.time("names_stream"):
+                            parsed = parser.feed(chunk)
+                        for name_data in parsed:
+                            stored = await store_names([name_from_data(name_data, style=request.style)])
+                            if not stored or stored[0].id in emitted_ids:
+                                continue
+                            name = stored[0]
+                            emitted_ids.add(name.id)
+                            generated += 1
+                            emitted += 1
+                            yield format_stream_event(name.dict(), "name", sse)
+                            if generated >= shortfall:
+                                break
+                        if generated >= shortfall or parser.done:
+                            break
+                finally:
+                    await chunks.aclose()
+
+                if emitted == 0:
+                    for name in await fallback_names(request):
+                        emitted += 1
+                        yield format_stream_event(name.dict(), "name", sse)
+        except Exception as e:
+            logger.error(f"Error streaming names: {e}")
+            metrics.errors.inc("generate_names_stream")
+            yield format_stream_event({"error": f"Error generating names: {str(e)}"}, "error", sse)
+
+        if sse:
+            yield format_stream_event({"count": emitted}, "done", sse)
+
+    # Runs after the stream ends or the client goes away; a no-op once the model call used it
+    background = BackgroundTask(chat_agent.release_slot, reservation) if reservation is not None else None
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(
+        events(), media_type=media_type, headers={"Cache-Control": "no-cache"}, background=background
+    )
 
-        # Create a descriptive prompt for the name
-        gender_desc = "baby boy" if name_obj.gender == "boy" else "baby girl" if name_obj.gender == "girl" else "baby"
-        prompt = f"Beautiful artistic illustration of the name '{name_obj.name}' written in elegant calligraphy, surrounded by soft pastel colors and gentle nature elements like flowers, stars, or clouds, perfect for a {gender_desc} nursery decoration. The name should be the focal point with beautiful typography, dreamy and peaceful atmosphere, soft lighting, watercolor style"
+# Image generation
+IMAGE_URL_PATTERNS = [
+    r'https://[^\s<>"\']+\.(?:jpg|jpeg|png|gif|webp|svg)',
+    r'https://storage\.googleapis\.com/[^\s<>"\']+',
+    r'"url"\s*:\s*"([^"]+)"',
+    r"'url'\s*:\s*'([^']+)'"
+]
+
+def extract_image_url(content: str) -> Optional[str]:
+    # Look for URL patterns in the response
+    for pattern in IMAGE_URL_PATTERNS:
+        matches = re.findall(pattern, content, re.IGNORECASE)
+        if matches:
+            return matches[0] if isinstance(matches[0], str) else matches[0][0]
+
+    # If no URL found, try to parse as JSON
+    try:
+        json_data = json.loads(content)
+        if isinstance(json_data, dict) and 'url' in json_data:
+            return json_data['url']
+    except (json.JSONDecodeError, TypeError):
+        pass
+    return None
 
-        # Use chat agent to generate image through MCP
-        global chat_agent
-        if chat_agent is None:
-            chat_agent = ChatAgent(agent_config)
+def name_image_prompt(name_obj: Name) -> str:
+    # Create a descriptive prompt for the name
+    gender_desc = "baby boy" if name_obj.gender == "boy" else "baby girl" if name_obj.gender == "girl" else "baby"
+    prompt = f"Beautiful artistic illustration of the name '{name_obj.name}' written in elegant calligraphy, surrounded by soft pastel colors and gentle nature elements like flowers, stars, or clouds, perfect for a {gender_desc} nursery decoration. The name should be the focal point with beautiful typography, dreamy and peaceful atmosphere, soft lighting, watercolor style"
 
-        # Create a prompt that instructs the agent to generate an image
-        image_prompt = f"""Please generate an image with this description: {prompt}
+    # Create a prompt that instructs the agent to generate an image
+    return f"""Please generate an image with this description: {prompt}
 
         Use the image generation tool to create this image. Return only the image URL from the result."""
 
-        result = await chat_agent.execute(image_prompt, use_tools=True)
-
-        if result.success and result.content:
-            # Try to extract URL from the response
-            content = result.content.strip()
-
-            # Look for URL patterns in the response
-            import re
-            url_patterns = [
-                r'https://[^\s<>"\']+\.(?:jpg|jpeg|png|gif|webp|svg)',
-                r'https://storage\.googleapis\.com/[^\s<>"\']+',
-                r'"url"\s*:\s*"([^"]+)"',
-                r"'url'\s*:\s*'([^']+)'"
-            ]
-
-            image_url = None
-            for pattern in url_patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                if matches:
-                    image_url = matches[0] if isinstance(matches[0], str) else matches[0][0]
-                    break
-
-            # If no URL found, try to parse as JSON
-            if not image_url:
-                try:
-                    import json
-                    json_data = json.loads(content)
-                    if isinstance(json_data, dict) and 'url' in json_data:
-                        image_url = json_data['url']
-                except:
-                    pass
-
-            if image_url:
-                # Update name with image URL in database
-                await db.names.update_one(
-                    {"id": name_id},
-                    {"$set": {"image_url": image_url}}
-                )
-
-                return ImageGenerationResponse(
-                    success=True,
-                    image_url=image_url
-                )
-            else:
-                return ImageGenerationResponse(
-                    success=False,
-                    error=f"Could not extract image URL from response: {content}"
-                )
-        else:
-            return ImageGenerationResponse(
-                success=False,
-                error=result.error or "Image generation failed"
-            )
+async def share_image_url(name_obj: Name, image_url: str) -> List[str]:
+    # Every copy of this name and gender renders the same prompt, so copies without
+    # an image get this one too; copies that already have their own keep it
+    name_ids = {name_obj.id}
+    async for doc in db.names.find(
+        {"name": name_obj.name, "gender": name_obj.gender, "image_url": None},
+        {"_id": 0, "id": 1}
+    ):
+        name_ids.add(doc["id"])
+
+    await db.names.update_many({"id": {"$in": list(name_ids)}}, {"$set": {"image_url": image_url}})
+    for name_id in name_ids:
+        name_catalog.update(name_id, {"image_url": image_url})
+    return list(name_ids)
+
+async def cached_name_image(name_obj: Name) -> Optional[str]:
+    # Image already generated for an identical prompt, applied to this name and its copies
+    image_url = await image_cache.get(image_cache.make_key(name_image_prompt(name_obj), agent_config.model_name))
+    if image_url:
+        await share_image_url(name_obj, image_url)
+    return image_url
+
+async def render_name_image(name_id: str) -> str:
+    # Runs on an image job worker; raises with a readable message on failure
+    name_doc = await db.names.find_one({"id": name_id}, {"_id": 0})
+    if not name_doc:
+        raise ValueError("Name not found")
+
+    name_obj = Name(**name_doc)
+    image_url = await cached_name_image(name_obj)
+    if image_url:
+        return image_url
+
+    # Use chat agent to generate image through MCP
+    chat_agent = await agent_registry.get("chat")
+    image_prompt = name_image_prompt(name_obj)
+    result = await chat_agent.execute(
+        image_prompt,
+        use_tools=True,
+        endpoint="image",
+        priority=Priority.BACKGROUND,
+        cache_if=lambda content: extract_image_url(content.strip()) is not None
+    )
+    if not result.success or not result.content:
+        raise ValueError(result.error or "Image generation failed")
+
+    content = result.content.strip()
+    image_url = extract_image_url(content)
+    if not image_url:
+        raise ValueError(f"Could not extract image URL from response: {content}")
+
+    # Remember the image for this prompt and update every copy of the name in one write
+    await image_cache.set(
+        image_cache.make_key(image_prompt, agent_config.model_name),
+        image_url,
+        image_prompt,
+        agent_config.model_name
+    )
+    await share_image_url(name_obj, image_url)
+    return image_url
+
+image_cache = ImageCache.from_env()
+image_jobs = ImageJobQueue.from_env(render_name_image)
+
+MAX_SEARCH_RESULTS = 100
+
+@api_router.get("/names/search", response_model=List[Name])
+async def search_names(
+    prefix: str = Query(..., min_length=1, max_length=50),
+    gender: Optional[str] = None,
+    origin: Optional[str] = None,
+    min_popularity: Optional[int] = Query(None, ge=1, le=100),
+    max_popularity: Optional[int] = Query(None, ge=1, le=100),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS)
+):
+    """Autocomplete stored names by prefix"""
+    if NAME_CATALOG_ENABLED and name_catalog.loaded:
+        docs = name_catalog.search(prefix, gender, origin, min_popularity, max_popularity, limit)
+        return ORJSONResponse(docs)
+
+    # Without the catalog: anchored regex on the lowercase name_key index
+    query = {"name_key": {"$regex": "^" + re.escape(prefix.strip().lower())}}
+    if gender:
+        query["gender"] = gender
+    if origin:
+        query["origin"] = origin
+    if min_popularity is not None or max_popularity is not None:
+        query["popularity_score"] = {"$gte": min_popularity or 1, "$lte": max_popularity or 100}
+    docs = await db.names.find(query, name_projection(None)).sort("name_key", 1).limit(limit).to_list(limit)
+    return ORJSONResponse(docs)
+
+MAX_SOUND_ALIKE_CANDIDATES = 1000
+
+@api_router.get("/names/sounds-like", response_model=List[Name])
+async def sounds_like_names(
+    name: str = Query(..., min_length=1, max_length=50),
+    gender: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS)
+):
+    """Stored names that sound like the given one"""
+    if NAME_CATALOG_ENABLED and name_catalog.loaded:
+        return ORJSONResponse(name_catalog.sounds_like(name, gender, limit))
+
+    # Without the catalog: the multikey phonetic_keys index, ranked here
+    keys = phonetic_keys(name)
+    if not keys:
+        return ORJSONResponse([])
+    query = {"phonetic_keys": {"$in": keys}}
+    if gender:
+        query["gender"] = gender
+    projection = {**name_projection(None), "phonetic_keys": 1}
+    docs = await db.names.find(query, projection).limit(MAX_SOUND_ALIKE_CANDIDATES).to_list(MAX_SOUND_ALIKE_CANDIDATES)
+    candidates = [(len(set(keys) & set(doc.pop("phonetic_keys", []))), doc) for doc in docs]
+    return ORJSONResponse(rank_sound_alikes(name, candidates, limit))
+
+@api_router.post("/names/{name_id}/generate-image", response_model=ImageJob, status_code=202)
+async def generate_name_image(name_id: str, current_user: User = Depends(get_current_user)):
+    """Queue image generation for a name; poll the returned job for the result"""
+    name_doc = await db.names.find_one({"id": name_id}, {"_id": 0})
+    if not name_doc:
+        raise HTTPException(status_code=404, detail="Name not found")
 
-    except Exception as e:
-        logger.error(f"Error generating image for name {name_id}: {e}")
-        return ImageGenerationResponse(
-            success=False,
-            error=f"Error generating image: {str(e)}"
-        )
+    # Same name and gender already has an image: answer with a finished job right away
+    image_url = await cached_name_image(Name(**name_doc))
+    if image_url:
+        return ImageJob(**await image_jobs.record_done(name_id, image_url, user_id=current_user.id))
+
+    # A job already in flight for this name is returned instead of starting another
+    return ImageJob(**await image_jobs.enqueue(name_id, user_id=current_user.id))
+
+@api_router.get("/images/jobs/{job_id}", response_model=ImageJob)
+async def get_image_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Status of an image generation job"""
+    job = await image_jobs.get(job_id, user_id=current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Image job not found")
+    return ImageJob(**job)
+
+# Paginated name list helpers
+NAME_FIELDS = list(Name.model_fields)
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = int(os.getenv("NAME_STREAM_BATCH_SIZE", "200"))
+
+def name_projection(fields: Optional[str]) -> dict:
+    # Comma-separated subset of Name fields; id is always returned (it is the cursor)
+    requested = NAME_FIELDS if not fields else [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in NAME_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    projection = {"_id": 0, "id": 1}
+    projection.update({f: 1 for f in requested})
+    return projection
+
+async def stream_json_array(cursor):
+    # Encode documents as they arrive instead of buffering the whole list
+    first = True
+    yield b"["
+    async for doc in cursor:
+        yield (b"" if first else b",") + orjson.dumps(doc)
+        first = False
+    yield b"]"
+
+async def names_page_response(name_ids: List[str], limit: Optional[int], cursor: Optional[str], fields: Optional[str]):
+    # Keyset pagination over names.id; without a limit the whole list is streamed.
+    # Names are validated when stored, so documents go straight to orjson.
+    projection = name_projection(fields)
+    if not name_ids:
+        return ORJSONResponse([])
+
+    query = {"id": {"$in": name_ids}}
+    if cursor:
+        query["id"]["$gt"] = cursor
+
+    if limit is None:
+        docs = db.names.find(query, projection).sort("id", 1).batch_size(STREAM_BATCH_SIZE)
+        return StreamingResponse(stream_json_array(docs), media_type="application/json")
+
+    docs = await db.names.find(query, projection).sort("id", 1).limit(limit + 1).to_list(limit + 1)
+    headers = {}
+    if len(docs) > limit:
+        docs = docs[:limit]
+        headers["X-Next-Cursor"] = docs[-1]["id"]
+    return ORJSONResponse(docs, headers=headers)
 
 # Favorites routes
 @api_router.post("/favorites/add/{name_id}")
-async def add_to_favorites(name_id: str, current_user: User = Depends(get_current_user)):
+async def add_to_favorites(name_id: str, background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user)):
     """Add a name to user's favorites"""
     # Check if name exists
-    name = await db.names.find_one({"id": name_id})
+    name = await db.names.find_one({"id": name_id}, {"_id": 1})
     if not name:
         raise HTTPException(status_code=404, detail="Name not found")
 
-    # Add to user's favorites if not already there
-    if name_id not in current_user.favorites:
-        current_user.favorites.append(name_id)
-        await db.users.update_one(
-            {"id": current_user.id},
-            {"$set": {"favorites": current_user.favorites}}
-        )
+    # Atomic add; concurrent clicks cannot overwrite each other
+    result = await db.users.update_one(
+        {"id": current_user.id},
+        {"$addToSet": {"favorites": name_id}, "$inc": {"favorites_version": 1}}
+    )
+    if result.modified_count:
+        background_tasks.add_task(refresh_share_snapshots, current_user.id)
 
     return {"message": "Added to favorites"}
 
 @api_router.delete("/favorites/remove/{name_id}")
-async def remove_from_favorites(name_id: str, current_user: User = Depends(get_current_user)):
+async def remove_from_favorites(name_id: str, background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user)):
     """Remove a name from user's favorites"""
-    if name_id in current_user.favorites:
-        current_user.favorites.remove(name_id)
-        await db.users.update_one(
+    result = await db.users.update_one(
+        {"id": current_user.id},
+        {"$pull": {"favorites": name_id}, "$inc": {"favorites_version": 1}}
+    )
+    if result.modified_count:
+        background_tasks.add_task(refresh_share_snapshots, current_user.id)
+
+    return {"message": "Removed from favorites"}
+
+@api_router.post("/favorites/bulk-add")
+async def bulk_add_to_favorites(
+    request: FavoritesBulkRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user)
+):
+    """Add many names to user's favorites in one round trip"""
+    name_ids = list(dict.fromkeys(request.name_ids))
+
+    # Single existence check for the whole batch
+    found = set()
+    async for doc in db.names.find({"id": {"$in": name_ids}}, {"_id": 0, "id": 1}):
+        found.add(doc["id"])
+    added = [name_id for name_id in name_ids if name_id in found]
+
+    if added:
+        result = await db.users.update_one(
             {"id": current_user.id},
-            {"$set": {"favorites": current_user.favorites}}
+            {"$addToSet": {"favorites": {"$each": added}}, "$inc": {"favorites_version": 1}}
         )
+        if result.modified_count:
+            background_tasks.add_task(refresh_share_snapshots, current_user.id)
 
-    return {"message": "Removed from favorites"}
+    return {
+        "message": f"Added {len(added)} names to favorites",
+        "added": added,
+        "not_found": [name_id for name_id in name_ids if name_id not in found]
+    }
+
+@api_router.post("/favorites/bulk-remove")
+async def bulk_remove_from_favorites(
+    request: FavoritesBulkRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user)
+):
+    """Remove many names from user's favorites in one round trip"""
+    name_ids = list(dict.fromkeys(request.name_ids))
+    # The document as it was before the pull tells which ids were actually favorites
+    before = await db.users.find_one_and_update(
+        {"id": current_user.id, "favorites": {"$in": name_ids}},
+        {"$pull": {"favorites": {"$in": name_ids}}, "$inc": {"favorites_version": 1}},
+        projection={"_id": 0, "favorites": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    previous = set(before["favorites"]) if before else set()
+    removed = [name_id for name_id in name_ids if name_id in previous]
+    if removed:
+        background_tasks.add_task(refresh_share_snapshots, current_user.id)
+
+    return {
+        "message": f"Removed {len(removed)} names from favorites",
+        "removed": removed,
+        "not_found": [name_id for name_id in name_ids if name_id not in previous]
+    }
 
 @api_router.get("/favorites", response_model=List[Name])
-async def get_user_favorites(current_user: User = Depends(get_current_user)):
+async def get_user_favorites(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
     """Get user's favorite names"""
-    if not current_user.favorites:
+    return await names_page_response(await load_favorites(current_user.id), limit, cursor, fields)
+
+async def snapshot_names(name_ids: List[str]) -> List[dict]:
+    if not name_ids:
         return []
+    return await db.names.find({"id": {"$in": name_ids}}, name_projection(None)).sort("id", 1).to_list(None)
 
-    names = await db.names.find({"id": {"$in": current_user.favorites}}).to_list(100)
-    return [Name(**name) for name in names]
+async def refresh_share_snapshots(user_id: str):
+    # Re-materialize every shared list of a user after their favorites change. Refreshes
+    # from rapid clicks can finish out of order, so a snapshot is only replaced by one
+    # built from a newer favorites_version than the one it was built from.
+    try:
+        user = await db.users.find_one({"id": user_id}, {"_id": 0, "favorites": 1, "favorites_version": 1})
+        if user is None:
+            return
+        favorites_version = user.get("favorites_version", 0)
+        names = await snapshot_names(user.get("favorites", []))
+        await db.favorites_lists.update_many(
+            {
+                "user_id": user_id,
+                "$or": [
+                    {"favorites_version": {"$lt": favorites_version}},
+                    {"favorites_version": {"$exists": False}}
+                ]
+            },
+            {
+                "$set": {
+                    "name_ids": user.get("favorites", []),
+                    "names": names,
+                    "favorites_version": favorites_version,
+                    "updated_at": datetime.utcnow()
+                },
+                "$inc": {"version": 1}
+            }
+        )
+        share_cache.evict_user(user_id)
+    except Exception as e:
+        logger.error(f"Failed to refresh shared lists for user {user_id}: {e}")
 
 @api_router.post("/favorites/share")
 async def create_shareable_list(current_user: User = Depends(get_current_user)):
     """Create a shareable link for user's favorites"""
+    # The snapshot needs the stored list and its version so later refreshes are ordered against it
+    user = await db.users.find_one({"id": current_user.id}, {"_id": 0, "favorites": 1, "favorites_version": 1})
+    favorites = (user or {}).get("favorites", [])
     favorites_list = FavoritesList(
         user_id=current_user.id,
-        name_ids=current_user.favorites.copy()
+        name_ids=favorites,
+        names=await snapshot_names(favorites),
+        favorites_version=(user or {}).get("favorites_version", 0)
     )
 
     await db.favorites_lists.insert_one(favorites_list.dict())
+    share_cache.set(favorites_list.share_token, {
+        "user_id": favorites_list.user_id,
+        "version": favorites_list.version,
+        "names": favorites_list.names
+    })
 
     return {
         "share_token": favorites_list.share_token,
@@ -455,40 +1055,100 @@ async def create_shareable_list(current_user: User = Depends(get_current_user)):
     }
 
 @api_router.get("/shared/{share_token}", response_model=List[Name])
-async def get_shared_favorites(share_token: str):
+async def get_shared_favorites(
+    share_token: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
     """Get shared favorites list by token"""
-    favorites_list = await db.favorites_lists.find_one({"share_token": share_token})
-    if not favorites_list:
-        raise HTTPException(status_code=404, detail="Shared list not found")
-
-    if not favorites_list["name_ids"]:
-        return []
-
-    names = await db.names.find({"id": {"$in": favorites_list["name_ids"]}}).to_list(100)
-    return [Name(**name) for name in names]
+    projection = name_projection(fields)
+
+    # Snapshot from memory, else a single read of the materialized document
+    snapshot = share_cache.get(share_token)
+    if snapshot is None:
+        snapshot = await db.favorites_lists.find_one(
+            {"share_token": share_token},
+            {"_id": 0, "user_id": 1, "version": 1, "names": 1, "name_ids": 1}
+        )
+        if not snapshot:
+            raise HTTPException(status_code=404, detail="Shared list not found")
+
+        # Lists shared before snapshots existed are materialized on first read
+        if "names" not in snapshot:
+            snapshot["names"] = await snapshot_names(snapshot["name_ids"])
+            snapshot["version"] = 1
+            await db.favorites_lists.update_one(
+                {"share_token": share_token},
+                {"$set": {"names": snapshot["names"], "version": 1}}
+            )
+        snapshot.pop("name_ids", None)
+        share_cache.set(share_token, snapshot)
+
+    names, next_cursor = page_snapshot(snapshot["names"], limit, cursor, projection)
+    headers = {"X-Share-Version": str(snapshot.get("version", 1))}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return ORJSONResponse(names, headers=headers)
+
+# Recommendations
+
+RECOMMENDATIONS_ENABLED = os.getenv("RECOMMENDATIONS_ENABLED", "true").lower() == "true"
+MAX_RECOMMENDATION_FAVORITES = 200
+recommender = None  # NameRecommender over the catalog, once built
+
+def build_recommender(docs: List[dict]):
+    # Runs in a worker thread; importing here keeps NumPy out of the startup import graph
+    from recommendations import NameRecommender
+    index = NameRecommender.from_env()
+    index.add(docs)
+    return index
+
+async def load_recommendations():
+    global recommender
+    try:
+        index = await asyncio.to_thread(build_recommender, name_catalog.all_docs())
+        # Names stored while the matrix was being built
+        index.add(name_catalog.all_docs())
+        recommender = index
+        logger.info(f"Recommendation matrix built for {len(index)} names")
+    except Exception as e:
+        logger.error(f"Failed to build recommendations: {e}")
+
+@api_router.get("/recommendations", response_model=List[Name])
+async def recommend_names(
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS),
+    gender: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stored names most like the user's favorites"""
+    if recommender is None:
+        raise HTTPException(status_code=503, detail="Recommendations are not available yet")
+    favorite_ids = (await load_favorites(current_user.id))[-MAX_RECOMMENDATION_FAVORITES:]
+    if not favorite_ids:
+        return ORJSONResponse([])
+
+    favorites = [doc for doc in map(name_catalog.get, favorite_ids) if doc]
+    # Favorites that are later copies of a catalog name are not in memory
+    missing = list(set(favorite_ids) - {doc["id"] for doc in favorites})
+    if missing:
+        favorites += await db.names.find({"id": {"$in": missing}}, name_projection(None)).to_list(len(missing))
+
+    # Scoring the whole catalog takes tens of ms at scale; keep it off the event loop
+    ranked = await asyncio.to_thread(recommender.recommend, favorites, limit, gender)
+    docs = [name_catalog.get(name_id) for name_id, _ in ranked]
+    return ORJSONResponse([doc for doc in docs if doc])
 
 # AI agent routes
 @api_router.post("/chat", response_model=ChatResponse)
 async def chat_with_agent(request: ChatRequest):
     # Chat with AI agent
-    global search_agent, chat_agent
-    
     try:
-        # Init agents if needed
-        if request.agent_type == "search" and search_agent is None:
-            search_agent = SearchAgent(agent_config)
-            
-        elif request.agent_type == "chat" and chat_agent is None:
-            chat_agent = ChatAgent(agent_config)
-        
-        # Select agent
-        agent = search_agent if request.agent_type == "search" else chat_agent
-        
-        if agent is None:
-            raise HTTPException(status_code=500, detail="Failed to initialize agent")
+        # Shared agent, built once
+        agent = await agent_registry.get(request.agent_type)
         
         # Execute agent
-        response = await agent.execute(request.message)
+        response = await agent.execute(request.message, endpoint="chat")
         
         return ChatResponse(
             success=response.success,
@@ -499,6 +1159,8 @@ async def chat_with_agent(request: ChatRequest):
             error=response.error
         )
         
+    except QueueFullError:
+        raise
     except Exception as e:
         logger.error(f"Error in chat endpoint: {e}")
         return ChatResponse(
@@ -513,16 +1175,12 @@ async def chat_with_agent(request: ChatRequest):
 @api_router.post("/search", response_model=SearchResponse)
 async def search_and_summarize(request: SearchRequest):
     # Web search with AI summary
-    global search_agent
-    
     try:
-        # Init search agent if needed
-        if search_agent is None:
-            search_agent = SearchAgent(agent_config)
+        search_agent = await agent_registry.get("search")
         
         # Search with agent
         search_prompt = f"Search for information about: {request.query}. Provide a comprehensive summary with key findings."
-        result = await search_agent.execute(search_prompt, use_tools=True)
+        result = await search_agent.execute(search_prompt, use_tools=True, endpoint="search", priority=Priority.BACKGROUND)
         
         if result.success:
             return SearchResponse(
@@ -541,6 +1199,8 @@ async def search_and_summarize(request: SearchRequest):
                 error=result.error
             )
             
+    except QueueFullError:
+        raise
     except Exception as e:
         logger.error(f"Error in search endpoint: {e}")
         return SearchResponse(
@@ -556,10 +1216,8 @@ async def search_and_summarize(request: SearchRequest):
 async def get_agent_capabilities():
     # Get agent capabilities
     try:
-        capabilities = {
-            "search_agent": SearchAgent(agent_config).get_capabilities(),
-            "chat_agent": ChatAgent(agent_config).get_capabilities()
-        }
+        # Computed once from the shared agents
+        capabilities = await agent_registry.capabilities()
         return {
             "success": True,
             "capabilities": capabilities
@@ -571,9 +1229,44 @@ async def get_agent_capabilities():
             "error": str(e)
         }
 
+@api_router.get("/metrics")
+async def get_metrics():
+    """Latency histograms and counters in Prometheus text format"""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+@api_router.get("/stats")
+async def get_stats():
+    """Cache and catalog counters"""
+    return {
+        "llm_cache": response_cache.stats(),
+        "name_catalog": name_catalog.stats(),
+        "recommendations": recommender.stats() if recommender is not None else None,
+        "password_hashing": password_hasher.stats(),
+        "auth_cache": auth_cache.stats(),
+        "share_cache": share_cache.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "name_batcher": name_batcher.stats() if name_batcher is not None else None,
+        "image_jobs": image_jobs.stats(),
+        "image_cache": image_cache.stats(),
+        "name_pools": name_pools.stats(),
+        "singleflight": {
+            "llm": llm_singleflight.stats(),
+            "name_generation": name_singleflight.stats()
+        }
+    }
+
 # Include router
 app.include_router(api_router)
 
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    # Model queue is saturated: tell clients when to come back instead of timing out
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -582,6 +1275,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the route histogram covers the whole request
+app.add_middleware(MetricsMiddleware)
+
 # Logging config
 logging.basicConfig(
     level=logging.INFO,
@@ -592,22 +1288,74 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
     # Initialize agents on startup
-    global search_agent, chat_agent
     logger.info("Starting AI Agents API...")
     
-    # Lazy agent init for faster startup
+    # Indexes first, so every later query is served from them
+    try:
+        applied = await run_migrations(db)
+        if applied:
+            logger.info(f"Applied migrations {applied}")
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+
+    try:
+        await sync_status_retention(db)
+    except Exception as e:
+        logger.error(f"Failed to apply status check retention: {e}")
+    try:
+        await sync_image_job_retention(db)
+    except Exception as e:
+        logger.error(f"Failed to apply image job retention: {e}")
+
+    # Refuse to start if a hot query would scan a whole collection
+    if os.getenv("INDEX_PLAN_CHECK", "false").lower() == "true":
+        await check_query_plans(db)
+
+    # Agents are built on first use unless prewarming is requested. Otherwise the
+    # agent stack is imported in the background, after the app starts serving.
+    if os.getenv("AGENT_PREWARM", "false").lower() == "true":
+        try:
+            await agent_registry.prewarm(ping=True)
+        except Exception as e:
+            logger.error(f"Failed to prewarm agents: {e}")
+    elif os.getenv("AGENT_PRELOAD", "true").lower() == "true":
+        app.state.agent_preload = asyncio.create_task(agent_registry.preload())
+
+    if os.getenv("LLM_CACHE_PERSISTENT", "true").lower() == "true":
+        response_cache.attach_collection(db.llm_cache)
+
+    if NAME_CATALOG_ENABLED:
+        try:
+            await name_catalog.load(db.names)
+        except Exception as e:
+            logger.error(f"Failed to load name catalog: {e}")
+
+    # The recommendation matrix is built from the catalog in the background
+    if RECOMMENDATIONS_ENABLED and name_catalog.loaded:
+        app.state.recommendations_build = asyncio.create_task(load_recommendations())
+
+    image_cache.attach_collection(db.image_cache)
+
+    # Pools fill in the background; requests fall through to the catalog until they do
+    name_pools.start()
+
+    # Image jobs run in the background; unfinished ones from a previous run are picked up again
+    try:
+        await image_jobs.start(db.image_jobs)
+    except Exception as e:
+        logger.error(f"Failed to start image job workers: {e}")
+
     logger.info("AI Agents API ready!")
 
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     # Cleanup on shutdown
-    global search_agent, chat_agent
-    
-    # Close MCP
-    if search_agent and search_agent.mcp_client:
-        # MCP cleanup automatic
-        pass
-    
+    # Drops the agents (MCP cleanup automatic) and closes the LLM connection pool
+    await name_pools.stop()
+    await image_jobs.stop()
+    await agent_registry.aclose()
+
+    password_hasher.shutdown()
     client.close()
     logger.info("AI Agents API shutdown complete.")
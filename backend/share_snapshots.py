@@ -0,0 +1,71 @@
+# Materialized snapshots of shared favorites lists
+
+import bisect
+import os
+from typing import Any, Dict, List, Optional
+
+from ai_agents.cache import TTLCache
+
+
+class ShareSnapshotCache:
+    # Bounded LRU of share_token -> snapshot; TTL bounds staleness across workers.
+    # The owner index only holds tokens still in the LRU, so it is bounded too.
+
+    def __init__(self, maxsize: int = None, ttl: float = None):
+        self.cache = TTLCache(
+            maxsize=maxsize or int(os.getenv("SHARE_CACHE_MAXSIZE", "2048")),
+            ttl=ttl if ttl is not None else float(os.getenv("SHARE_CACHE_TTL", "300")),
+            on_evict=self._forget,
+        )
+        self._tokens_by_user: Dict[str, set] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, share_token: str) -> Optional[Dict[str, Any]]:
+        snapshot = self.cache.get(share_token)
+        if snapshot is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return snapshot
+
+    def set(self, share_token: str, snapshot: Dict[str, Any]):
+        self.cache.set(share_token, snapshot)
+        self._tokens_by_user.setdefault(snapshot["user_id"], set()).add(share_token)
+
+    def _forget(self, share_token: str, snapshot: Dict[str, Any]):
+        tokens = self._tokens_by_user.get(snapshot["user_id"])
+        if tokens is not None:
+            tokens.discard(share_token)
+            if not tokens:
+                del self._tokens_by_user[snapshot["user_id"]]
+
+    def evict_user(self, user_id: str):
+        for share_token in self._tokens_by_user.pop(user_id, set()):
+            self.cache.pop(share_token)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self.cache),
+        }
+
+
+def page_snapshot(
+    names: List[Dict[str, Any]],
+    limit: Optional[int],
+    cursor: Optional[str],
+    projection: Dict[str, int],
+):
+    # Keyset page over snapshot names (stored sorted by id); returns (docs, next_cursor)
+    start = 0
+    if cursor:
+        start = bisect.bisect_right([doc["id"] for doc in names], cursor)
+    end = len(names) if limit is None else start + limit
+    fields = [field for field, include in projection.items() if include and field != "_id"]
+    page = [{field: doc[field] for field in fields if field in doc} for doc in names[start:end]]
+    next_cursor = page[-1]["id"] if limit is not None and end < len(names) and page else None
+    return page, next_cursor
@@ -0,0 +1,91 @@
+# Query helpers for status_checks: filters, keyset paging and time-bucketed counts
+
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+MAX_SUMMARY_BUCKETS = 10000
+EPOCH = datetime(1970, 1, 1)
+
+
+def retention_seconds() -> int:
+    # STATUS_RETENTION_DAYS=0 keeps status checks forever
+    return int(float(os.getenv("STATUS_RETENTION_DAYS", "30")) * 86400)
+
+
+def parse_interval(value: str) -> int:
+    # "30s", "5m", "1h", "1d" -> seconds
+    match = re.fullmatch(r"\s*(\d+)\s*([smhd])\s*", value or "")
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid interval {value!r}; use a number followed by s, m, h or d")
+    return int(match.group(1)) * INTERVAL_UNITS[match.group(2)]
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Stored timestamps are naive UTC; convert offset-aware query parameters to match
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def status_filter(
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    if client_name:
+        query["client_name"] = client_name
+    if since or until:
+        query["timestamp"] = {}
+        if since:
+            query["timestamp"]["$gte"] = since
+        if until:
+            query["timestamp"]["$lt"] = until
+    return query
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    return f"{doc['timestamp'].isoformat()}|{doc['id']}"
+
+
+def apply_cursor(query: Dict[str, Any], cursor: str) -> Dict[str, Any]:
+    # Newest first: continue after (timestamp, id) of the last row returned
+    timestamp, _, last_id = cursor.partition("|")
+    try:
+        timestamp = datetime.fromisoformat(timestamp)
+    except ValueError:
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    after = {"$or": [{"timestamp": {"$lt": timestamp}}, {"timestamp": timestamp, "id": {"$lt": last_id}}]}
+    return {"$and": [query, after]} if query else after
+
+
+def summary_window(
+    interval_seconds: int,
+    since: Optional[datetime],
+    until: Optional[datetime],
+) -> Tuple[datetime, datetime]:
+    # Defaults to the last 24 hours; refuses windows that would produce huge responses
+    until = until or datetime.utcnow()
+    since = since or until - timedelta(days=1)
+    if since >= until:
+        raise ValueError("since must be before until")
+    if (until - since).total_seconds() / interval_seconds > MAX_SUMMARY_BUCKETS:
+        raise ValueError(f"Window spans more than {MAX_SUMMARY_BUCKETS} buckets; use a larger interval")
+    return since, until
+
+
+def summary_pipeline(query: Dict[str, Any], interval_seconds: int) -> List[Dict[str, Any]]:
+    # Buckets are aligned to the epoch (UTC): timestamp - (timestamp mod interval)
+    interval_ms = interval_seconds * 1000
+    # (date - date is milliseconds, date - milliseconds is a date)
+    epoch_ms = {"$subtract": ["$timestamp", EPOCH]}
+    bucket = {"$subtract": ["$timestamp", {"$mod": [epoch_ms, interval_ms]}]}
+    return [
+        {"$match": query},
+        {"$group": {"_id": {"bucket": bucket, "client_name": "$client_name"}, "count": {"$sum": 1}}},
+        {"$sort": {"_id.bucket": 1, "_id.client_name": 1}},
+        {"$project": {"_id": 0, "bucket": "$_id.bucket", "client_name": "$_id.client_name", "count": 1}},
+    ]
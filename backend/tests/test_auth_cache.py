@@ -0,0 +1,41 @@
+# Authenticated-user cache tests
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from auth_cache import AuthCache
+
+
+def test_token_not_cached_past_expiry():
+    cache = AuthCache(maxsize=10, ttl=60)
+    cache.set_token("expired", "u1", expires_at=time.time() - 1)
+    cache.set_token("valid", "u1", expires_at=time.time() + 3600)
+    assert cache.get_user_id("expired") is None
+    assert cache.get_user_id("valid") == "u1"
+
+
+def test_invalidate_user_and_returned_copies():
+    cache = AuthCache(maxsize=10, ttl=60)
+    cache.set_user("u1", {"id": "u1", "email": "a@example.com"})
+
+    doc = cache.get_user("u1")
+    doc["email"] = "changed"
+    assert cache.get_user("u1")["email"] == "a@example.com"
+
+    cache.invalidate_user("u1")
+    assert cache.get_user("u1") is None
+    stats = cache.stats()
+    assert stats["user_hits"] == 2
+    assert stats["user_misses"] == 1
+    assert stats["invalidations"] == 1
+
+
+def test_favorites_are_never_cached():
+    cache = AuthCache(maxsize=10, ttl=60)
+    cache.set_user("u1", {"id": "u1", "email": "a@example.com", "favorites": ["a"], "favorites_version": 3})
+    assert cache.get_user("u1") == {"id": "u1", "email": "a@example.com"}
@@ -0,0 +1,29 @@
+# Content-addressed image cache tests
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from image_cache import ImageCache
+
+
+def test_key_depends_on_prompt_and_model_only():
+    key = ImageCache.make_key("Draw  the name 'Olivia'", "model-a")
+    assert key == ImageCache.make_key("Draw the name 'Olivia'", "model-a")
+    assert key != ImageCache.make_key("Draw the name 'Olivia'", "model-b")
+    assert key != ImageCache.make_key("Draw the name 'Liam'", "model-a")
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_counts_hits_and_misses():
+    cache = ImageCache(maxsize=4)
+    key = ImageCache.make_key("prompt", "model")
+    assert await cache.get(key) is None
+    await cache.set(key, "https://img/olivia.png", "prompt", "model")
+    assert await cache.get(key) == "https://img/olivia.png"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
@@ -0,0 +1,177 @@
+# Image job queue tests
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from image_jobs import ImageJobQueue
+
+
+class FakeJobs:
+    # Just enough of a Motor collection for the queue
+    def __init__(self):
+        self.docs = []
+
+    def _match(self, doc, query):
+        if "$or" in query:
+            return any(self._match(doc, branch) for branch in query["$or"])
+        for key, value in query.items():
+            if isinstance(value, dict) and "$lt" in value:
+                if doc.get(key) is None or not doc[key] < value["$lt"]:
+                    return False
+            elif isinstance(doc.get(key), list) and not isinstance(value, list):
+                if value not in doc[key]:
+                    return False
+            elif doc.get(key) != value:
+                return False
+        return True
+
+    @staticmethod
+    def _apply(doc, update):
+        doc.update(update.get("$set", {}))
+        for key, value in update.get("$addToSet", {}).items():
+            values = doc.setdefault(key, [])
+            if value not in values:
+                values.append(value)
+
+    @staticmethod
+    def _project(doc, projection):
+        hidden = {key for key, include in (projection or {}).items() if not include}
+        return {k: v for k, v in doc.items() if k not in hidden}
+
+    async def find_one(self, query, projection=None):
+        for doc in self.docs:
+            if self._match(doc, query):
+                return self._project(doc, projection)
+        return None
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if self._match(doc, query):
+                self._apply(doc, update)
+                return
+
+    async def find_one_and_update(self, query, update, projection=None, sort=None, upsert=False, return_document=None):
+        for doc in self.docs:
+            if self._match(doc, query):
+                self._apply(doc, update)
+                return self._project(doc, projection)
+        if not upsert:
+            return None
+        doc = {**query, **update.get("$setOnInsert", {})}
+        self._apply(doc, update)
+        self.docs.append(doc)
+        return self._project(doc, projection)
+
+
+@pytest.mark.asyncio
+async def test_jobs_for_the_same_name_are_deduplicated_until_finished():
+    rendered = []
+
+    async def render(name_id):
+        rendered.append(name_id)
+        await asyncio.sleep(0.01)
+        return f"https://img/{name_id}.png"
+
+    queue = ImageJobQueue(render, workers=2, poll_interval=0.05)
+    await queue.start(FakeJobs())
+    try:
+        first = await queue.enqueue("n1")
+        second = await queue.enqueue("n1")
+        assert first["id"] == second["id"]
+
+        for _ in range(50):
+            job = await queue.get(first["id"])
+            if job["status"] == "done":
+                break
+            await asyncio.sleep(0.01)
+        assert job["image_url"] == "https://img/n1.png"
+        assert rendered == ["n1"]
+
+        # Finished jobs no longer absorb new requests
+        third = await queue.enqueue("n1")
+        assert third["id"] != first["id"]
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_render_errors_mark_the_job_failed():
+    async def render(name_id):
+        raise ValueError("Name not found")
+
+    queue = ImageJobQueue(render, workers=1, poll_interval=0.05)
+    await queue.start(FakeJobs())
+    try:
+        job = await queue.enqueue("missing")
+        for _ in range(50):
+            job = await queue.get(job["id"])
+            if job["status"] == "failed":
+                break
+            await asyncio.sleep(0.01)
+        assert job["error"] == "Name not found"
+        assert queue.stats()["failed"] == 1
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_stale_running_jobs_are_reclaimed_while_workers_poll():
+    async def render(name_id):
+        return f"https://img/{name_id}.png"
+
+    jobs = FakeJobs()
+    now = datetime.utcnow()
+    for job_id, started_at in (("dead", now - timedelta(seconds=120)), ("live", now)):
+        jobs.docs.append({
+            "id": job_id, "name_id": job_id, "status": "running", "active": True,
+            "created_at": started_at, "started_at": started_at,
+        })
+
+    queue = ImageJobQueue(render, workers=1, poll_interval=0.02, stale_after=60)
+    await queue.start(jobs)
+    try:
+        for _ in range(50):
+            if (await queue.get("dead"))["status"] == "done":
+                break
+            await asyncio.sleep(0.01)
+        assert (await queue.get("dead"))["image_url"] == "https://img/dead.png"
+        assert (await queue.get("live"))["status"] == "running"
+        # A new request for the name is no longer absorbed by the dead job
+        assert (await queue.enqueue("dead"))["id"] != "dead"
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_jobs_are_private_to_their_users_and_cached_answers_reuse_one_document():
+    async def render(name_id):
+        await asyncio.sleep(1)
+
+    jobs = FakeJobs()
+    queue = ImageJobQueue(render, workers=0)
+    await queue.start(jobs)
+    try:
+        job = await queue.enqueue("n1", user_id="alice")
+        assert (await queue.enqueue("n1", user_id="bob"))["id"] == job["id"]
+        assert (await queue.get(job["id"], user_id="bob"))["status"] == "queued"
+        assert await queue.get(job["id"], user_id="mallory") is None
+        assert "user_ids" not in job
+
+        first = await queue.record_done("n2", "https://img/n2.png", user_id="alice")
+        second = await queue.record_done("n2", "https://img/n2.png", user_id="bob")
+        assert first["id"] == second["id"] and second["status"] == "done"
+        assert len([doc for doc in jobs.docs if doc["name_id"] == "n2"]) == 1
+        assert await queue.get(first["id"], user_id="bob") is not None
+    finally:
+        await queue.stop()
@@ -0,0 +1,39 @@
+# Incremental JSON array parser tests
+
+import sys
+from pathlib import Path
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from json_stream import JSONArrayStreamParser
+
+
+def feed_all(parser, chunks):
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    return items
+
+
+def test_objects_emitted_as_soon_as_complete():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"name": "Em') == []
+    assert parser.feed('ma"}, {"name"') == [{"name": "Emma"}]
+    assert parser.feed(': "Liam"}]') == [{"name": "Liam"}]
+    assert parser.done
+
+
+def test_skips_fences_and_handles_braces_in_strings():
+    parser = JSONArrayStreamParser()
+    text = '```json\n[{"name": "A}b\\"c", "tags": ["x", {"y": 1}]},\n {"name": "D"}]\n```'
+    items = feed_all(parser, [text[i:i + 3] for i in range(0, len(text), 3)])
+    assert items == [{"name": 'A}b"c', "tags": ["x", {"y": 1}]}, {"name": "D"}]
+
+
+def test_malformed_element_is_skipped():
+    parser = JSONArrayStreamParser()
+    items = parser.feed('[{"name": "A",}, {"name": "B"}]')
+    assert items == [{"name": "B"}]
+    assert parser.skipped == 1
@@ -0,0 +1,61 @@
+# Metrics tests
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import metrics
+from ai_agents.instrumentation import add_llm_observer, llm_observers, observe_llm_call
+from metrics import MetricsRegistry, MongoCommandMetrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage latency", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "mongo")
+    histogram.observe(0.1, "mongo")
+    histogram.observe(5, "mongo")
+    registry.counter("fallback_total", "Fallbacks", ("path",)).inc("sample_names")
+
+    text = registry.render()
+    assert '# TYPE stage_seconds histogram' in text
+    assert 'stage_seconds_bucket{stage="mongo",le="0.1"} 2' in text
+    assert 'stage_seconds_bucket{stage="mongo",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="mongo",le="+Inf"} 3' in text
+    assert 'stage_seconds_count{stage="mongo"} 3' in text
+    assert 'fallback_total{path="sample_names"} 1' in text
+
+
+def test_mongo_listener_labels_by_collection_and_operation():
+    listener = MongoCommandMetrics()
+    before = metrics.mongo_operation_seconds.count("names", "find")
+
+    listener.started(SimpleNamespace(command_name="find", command={"find": "names"}, request_id=1, connection_id=("h", 1)))
+    listener.started(SimpleNamespace(command_name="hello", command={"hello": 1}, request_id=2, connection_id=("h", 1)))
+    listener.succeeded(SimpleNamespace(request_id=1, connection_id=("h", 1), duration_micros=1500))
+    listener.succeeded(SimpleNamespace(request_id=2, connection_id=("h", 1), duration_micros=100))
+
+    assert metrics.mongo_operation_seconds.count("names", "find") == before + 1
+    assert listener._pending == {}
+
+
+@pytest.mark.asyncio
+async def test_llm_observer_sees_outcome():
+    seen = []
+    observer = lambda model, endpoint, seconds, outcome: seen.append((model, endpoint, outcome))
+    add_llm_observer(observer)
+    try:
+        with observe_llm_call("model-a", "names"):
+            pass
+        with pytest.raises(RuntimeError):
+            with observe_llm_call("model-a", "chat"):
+                raise RuntimeError("boom")
+    finally:
+        llm_observers.remove(observer)
+    assert seen == [("model-a", "names", "success"), ("model-a", "chat", "error")]
@@ -0,0 +1,107 @@
+# Index migration tests
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from migrations import (
+    MIGRATIONS,
+    MIGRATIONS_COLLECTION,
+    IndexPlanError,
+    Migration,
+    _has_collscan,
+    check_query_plans,
+    run_migrations,
+)
+
+
+class FakeCursor:
+    def __init__(self, docs, plan):
+        self.docs = docs
+        self.plan = plan
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+    async def explain(self):
+        return {"queryPlanner": {"winningPlan": self.plan}}
+
+
+class FakeCollection:
+    def __init__(self, plan=None):
+        self.docs = []
+        self.plan = plan or {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}
+
+    def find(self, query=None, projection=None):
+        return FakeCursor(list(self.docs), self.plan)
+
+    async def update_one(self, query, update, upsert=False):
+        for doc in self.docs:
+            if doc["_id"] == query["_id"]:
+                doc.update(update["$set"])
+                return
+        if upsert:
+            self.docs.append({**query, **update["$set"]})
+
+
+class FakeDb:
+    def __init__(self, plans=None):
+        self.collections = {name: FakeCollection(plan) for name, plan in (plans or {}).items()}
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+
+def test_versions_are_unique_and_increasing():
+    versions = [m.version for m in MIGRATIONS]
+    assert versions == sorted(set(versions))
+
+
+def test_collscan_detected_in_nested_plans():
+    indexed = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "email_1"}}
+    assert not _has_collscan(indexed)
+
+    nested = {"queryPlan": {"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]}}
+    assert _has_collscan(nested)
+
+
+@pytest.mark.asyncio
+async def test_run_migrations_applies_pending_versions_in_order_once():
+    calls = []
+
+    def step(version):
+        async def apply(db):
+            calls.append(version)
+        return Migration(version, f"step {version}", apply)
+
+    db = FakeDb()
+    db[MIGRATIONS_COLLECTION].docs.append({"_id": 2, "description": "step 2"})
+
+    assert await run_migrations(db, [step(3), step(1), step(2)]) == [1, 3]
+    assert calls == [1, 3]
+    assert sorted(doc["_id"] for doc in db[MIGRATIONS_COLLECTION].docs) == [1, 2, 3]
+
+    assert await run_migrations(db, [step(3), step(1), step(2)]) == []
+    assert calls == [1, 3]
+
+
+@pytest.mark.asyncio
+async def test_check_query_plans_fails_on_a_collection_scan():
+    queries = [("users", {"id": "plan-check"}), ("names", {"gender": "girl"})]
+    assert await check_query_plans(FakeDb(), queries) == {
+        "users {'id': 'plan-check'}": "indexed",
+        "names {'gender': 'girl'}": "indexed",
+    }
+
+    db = FakeDb({"names": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}})
+    with pytest.raises(IndexPlanError, match="names"):
+        await check_query_plans(db, queries)
@@ -0,0 +1,84 @@
+# Name request micro-batching tests
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from name_batcher import NameBatchItem, NameGenerationFailed, NameRequestBatcher, parse_batch_sections
+
+
+def reply(content, success=True):
+    return SimpleNamespace(success=success, content=content)
+
+
+@pytest.mark.asyncio
+async def test_requests_in_window_share_one_call_and_get_their_section():
+    prompts, singles = [], []
+
+    async def execute(prompt):
+        prompts.append(prompt)
+        return reply(json.dumps({
+            "r1": [{"name": "Emma"}, {"name": "Ava"}, {"name": "Extra"}],
+            "r2": [{"name": "Liam"}],
+        }))
+
+    async def single(item):
+        singles.append(item)
+        return []
+
+    batcher = NameRequestBatcher(execute, single, window_ms=20)
+    first, second = await asyncio.gather(
+        batcher.submit(NameBatchItem(count=2, gender="girl")),
+        batcher.submit(NameBatchItem(count=1, gender="boy", style="modern")),
+    )
+    assert len(prompts) == 1 and "r1: 2 baby names for girls" in prompts[0]
+    assert "r2: 1 baby names for boys in modern style" in prompts[0]
+    assert [n["name"] for n in first] == ["Emma", "Ava"]
+    assert [n["name"] for n in second] == ["Liam"]
+    assert singles == []
+    assert batcher.stats()["batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_malformed_section_falls_back_to_individual_request():
+    async def execute(prompt):
+        return reply('```json\n{"r1": [{"name": "Emma"}], "r2": "oops"}\n```')
+
+    async def single(item):
+        return [{"name": "Noah"}]
+
+    batcher = NameRequestBatcher(execute, single, window_ms=20)
+    first, second = await asyncio.gather(
+        batcher.submit(NameBatchItem(count=1)),
+        batcher.submit(NameBatchItem(count=1)),
+    )
+    assert first == [{"name": "Emma"}]
+    assert second == [{"name": "Noah"}]
+    assert batcher.stats()["fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lone_request_and_failures_use_the_individual_path():
+    async def execute(prompt):
+        raise AssertionError("a single request is not batched")
+
+    async def single(item):
+        raise NameGenerationFailed("model down")
+
+    batcher = NameRequestBatcher(execute, single, window_ms=1)
+    with pytest.raises(NameGenerationFailed):
+        await batcher.submit(NameBatchItem(count=3))
+
+
+def test_parse_batch_sections_ignores_non_objects():
+    assert parse_batch_sections("no json here") == {}
+    assert parse_batch_sections("[1, 2]") == {}
+    assert parse_batch_sections('Sure! {"r1": []}') == {"r1": []}
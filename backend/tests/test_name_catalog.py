@@ -0,0 +1,114 @@
+# Name catalog index tests
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from name_catalog import NameCatalog, name_key
+
+
+def make_doc(name_id, name, gender="girl", origin="Latin", popularity=50, style=None):
+    return {
+        "id": name_id,
+        "name": name,
+        "gender": gender,
+        "origin": origin,
+        "meaning": "Test",
+        "popularity_score": popularity,
+        "style": style,
+    }
+
+
+def test_duplicates_collapse_on_canonical_key():
+    catalog = NameCatalog()
+    assert catalog.add(make_doc("1", "Olivia"))
+    assert not catalog.add(make_doc("2", " olivia ", origin="latin"))
+    assert catalog.add(make_doc("3", "Olivia", gender="unisex"))
+    assert len(catalog) == 2
+    assert name_key("Olivia", "girl", "Latin") == name_key("OLIVIA ", "Girl", "latin")
+
+
+def test_sample_skips_excluded_and_counts_hits():
+    catalog = NameCatalog()
+    catalog.add_many(make_doc(str(i), f"Name{i}") for i in range(5))
+
+    picked = catalog.sample(3, gender="girl", exclude_names=["name0"])
+    assert len(picked) == 3
+    assert "Name0" not in {doc["name"] for doc in picked}
+
+    assert len(catalog.sample(10, gender="girl")) == 5
+    assert catalog.stats()["hits"] == 1
+    assert catalog.stats()["misses"] == 1
+
+
+def test_prefix_search_is_alphabetical_and_filtered():
+    catalog = NameCatalog()
+    catalog.add_many([
+        make_doc("1", "Arlo", gender="boy", popularity=40),
+        make_doc("2", "Aria", popularity=90),
+        make_doc("3", "Ariel", origin="Hebrew", popularity=60),
+        make_doc("4", "Ava", popularity=95),
+        make_doc("5", "Bea"),
+    ])
+    assert [doc["name"] for doc in catalog.search("AR")] == ["Aria", "Ariel", "Arlo"]
+    assert [doc["name"] for doc in catalog.search("ar", limit=2)] == ["Aria", "Ariel"]
+    assert [doc["name"] for doc in catalog.search("a", gender="girl", min_popularity=80)] == ["Aria", "Ava"]
+    assert [doc["name"] for doc in catalog.search("ari", origin="hebrew")] == ["Ariel"]
+    assert catalog.search("z") == []
+    assert catalog.search(" ") == []
+
+
+def test_prefix_index_after_bulk_load_and_incremental_adds():
+    class Collection:
+        def find(self, query, projection):
+            async def docs():
+                for doc in [make_doc("2", "Mila"), make_doc("1", "Maya"), make_doc("3", "Nora")]:
+                    yield doc
+            return docs()
+
+    catalog = NameCatalog()
+    asyncio.run(catalog.load(Collection()))
+    catalog.add(make_doc("4", "Miles", gender="boy"))
+    catalog.add(make_doc("0", "Mila", gender="unisex"))
+    assert [(doc["name"], doc["id"]) for doc in catalog.search("mi")] == [("Mila", "0"), ("Mila", "2"), ("Miles", "4")]
+    assert [doc["name"] for doc in catalog.search("m")] == ["Maya", "Mila", "Mila", "Miles"]
+
+
+def test_sounds_like_uses_phonetic_index():
+    catalog = NameCatalog()
+    catalog.add_many([
+        make_doc("1", "Aiden", gender="boy"),
+        make_doc("2", "Ayden", gender="boy", popularity=20),
+        make_doc("3", "Jaden", gender="boy", popularity=90),
+        make_doc("4", "Eden", popularity=60),
+        make_doc("5", "Mila"),
+        {**make_doc("6", "Aidan", gender="boy", popularity=70), "phonetic_keys": ["M:ATN"]},
+    ])
+    assert [doc["name"] for doc in catalog.sounds_like("aiden")] == ["Ayden", "Eden", "Jaden", "Aidan"]
+    assert [doc["name"] for doc in catalog.sounds_like("Aiden", gender="girl")] == ["Eden"]
+    assert "phonetic_keys" not in catalog.get("6")
+    assert catalog.sounds_like("Zzz") == []
+
+
+def test_sample_draws_filtered_names_and_finds_rare_matches():
+    catalog = NameCatalog()
+    catalog.add_many(make_doc(str(i), f"Name{i % 50}", origin=f"Origin{i}", style="modern") for i in range(500))
+    catalog.add_many([
+        make_doc("b1", "Otto", gender="boy", style="classic"),
+        make_doc("b2", "Otis", gender="boy", style="classic"),
+        make_doc("b3", "Otto", gender="boy", origin="German", style="classic"),
+    ])
+
+    picked = catalog.sample(10, gender="girl", style="modern", exclude_names=["name0"])
+    spellings = [doc["name"] for doc in picked]
+    assert len(spellings) == 10 == len(set(spellings))
+    assert "Name0" not in spellings
+
+    # Too few matches for random draws to fill; the pool walk still finds every one
+    assert sorted(doc["name"] for doc in catalog.sample(5, gender="boy", style="classic")) == ["Otis", "Otto"]
+    assert catalog.sample(5, gender="girl", style="classic") == []
+    assert len(catalog.sample(60)) == 52
@@ -0,0 +1,116 @@
+# Pre-generated name pool tests
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from name_pools import NamePoolManager, parse_buckets
+
+
+def test_parse_buckets():
+    assert parse_buckets("girl:Modern, boy ,:unique,") == [("girl", "modern"), ("boy", ""), ("", "unique")]
+    assert parse_buckets("") == []
+
+
+@pytest.mark.asyncio
+async def test_pools_fill_serve_and_refill_below_low_water():
+    calls = []
+
+    async def generate(gender, style, count, exclude):
+        calls.append((gender, style, count))
+        return [{"name": f"{gender}-{len(calls)}-{i}"} for i in range(count)]
+
+    pools = NamePoolManager(generate, [("girl", "modern")], target_size=6, low_water=3, refill_batch=4, refill_interval=10)
+    pools.start()
+    try:
+        for _ in range(50):
+            if pools.stats()["pools"]["girl/modern"] == 6:
+                break
+            await asyncio.sleep(0.01)
+        assert calls == [("girl", "modern", 4), ("girl", "modern", 2)]
+
+        assert len(pools.take("Girl", "modern", 4)) == 4
+        assert pools.take("boy", None, 2) == []
+        for _ in range(50):
+            if pools.stats()["pools"]["girl/modern"] == 6:
+                break
+            await asyncio.sleep(0.01)
+        assert pools.stats()["pools"]["girl/modern"] == 6
+
+        stats = pools.stats()
+        assert stats["hits"] == 1 and stats["names_served"] == 4
+    finally:
+        await pools.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_refill_is_counted_and_pool_stays_usable():
+    async def generate(gender, style, count, exclude):
+        raise RuntimeError("model down")
+
+    pools = NamePoolManager(generate, [("boy", "")], target_size=4, low_water=2, refill_interval=10)
+    pools.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert pools.take("boy", "", 3) == []
+        assert pools.stats()["refill_errors"] >= 1
+        assert pools.stats()["misses"] == 1
+    finally:
+        await pools.stop()
+
+
+@pytest.mark.asyncio
+async def test_refill_stops_when_a_batch_adds_nothing_new():
+    calls = []
+
+    async def generate(gender, style, count, exclude):
+        calls.append(count)
+        return [{"name": "Luna"}]
+
+    pools = NamePoolManager(generate, [("girl", "")], target_size=4, low_water=2, refill_interval=10)
+    pools.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert len(calls) == 2
+        stats = pools.stats()
+        assert stats["pools"]["girl/*"] == 1
+        assert stats["refill_errors"] == 1
+    finally:
+        await pools.stop()
+
+
+@pytest.mark.asyncio
+async def test_a_generator_repeating_its_batch_does_not_reserve_served_names():
+    rounds = []
+
+    async def generate(gender, style, count, exclude):
+        rounds.append(list(exclude))
+        return [{"name": name} for name in ("Ada", "Bea", "Cleo", "Dina")]
+
+    pools = NamePoolManager(generate, [("girl", "")], target_size=4, low_water=2, refill_interval=10)
+    pools.start()
+    try:
+        for _ in range(50):
+            if pools.stats()["pools"]["girl/*"] == 4:
+                break
+            await asyncio.sleep(0.01)
+        served = [doc["name"] for doc in pools.take("girl", None, 4)]
+        assert served == ["Ada", "Bea", "Cleo", "Dina"]
+
+        # The drained pool asks again, excluding what it served, and gets the same batch back
+        for _ in range(50):
+            if len(rounds) >= 2:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.02)
+        assert rounds[1] == ["Ada", "Bea", "Cleo", "Dina"]
+        assert pools.take("girl", None, 4) == []
+        assert pools.stats()["refill_errors"] == 1
+    finally:
+        await pools.stop()
@@ -0,0 +1,98 @@
+# Name persistence pipeline tests
+
+import sys
+from pathlib import Path
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from name_store import canonicalize, persist_names
+
+
+class FakeNames:
+    # Just enough of a Motor collection for persist_names. Keys in `racing` were inserted
+    # by another request after this bulk write started, so their upserts hit the unique index.
+    def __init__(self, stored=(), racing=()):
+        self.docs = {doc["name_key"]: doc for doc in stored}
+        self.racing = {doc["name_key"]: doc for doc in racing}
+        self.bulk_writes = []
+
+    async def bulk_write(self, ops, ordered=True):
+        self.bulk_writes.append((len(ops), ordered))
+        upserted, errors = [], []
+        for index, op in enumerate(ops):
+            key = op._filter["name_key"]
+            if key in self.racing:
+                self.docs[key] = self.racing.pop(key)
+                errors.append({"index": index, "code": 11000, "errmsg": "E11000 duplicate key"})
+            elif key not in self.docs:
+                self.docs[key] = {**op._doc["$setOnInsert"], "name_key": key}
+                upserted.append({"index": index, "_id": key})
+
+        class Result:
+            upserted_ids = {item["index"]: item["_id"] for item in upserted}
+
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "upserted": upserted})
+        return Result()
+
+    def find(self, query, projection=None):
+        keys = query["name_key"]["$in"]
+
+        async def docs():
+            for key in keys:
+                if key in self.docs:
+                    yield dict(self.docs[key])
+        return docs()
+
+
+def make_name(name_id, name, origin="Latin"):
+    return {"id": name_id, "name": name, "gender": "girl", "origin": origin}
+
+
+def test_canonicalize_drops_batch_duplicates_and_adds_key():
+    docs = [
+        {"id": "1", "name": "Emma", "gender": "girl", "origin": "Germanic"},
+        {"id": "2", "name": "emma ", "gender": "Girl", "origin": "germanic"},
+        {"id": "3", "name": "Emma", "gender": "girl", "origin": "Hebrew"},
+    ]
+    batch = canonicalize(docs)
+    assert [doc["id"] for doc in batch] == ["1", "3"]
+    assert batch[0]["name_key"] == "emma|girl|germanic"
+    assert "name_key" not in docs[0]
+    assert batch[0]["phonetic_keys"] == ["S:E500", "M:AM", "R:AM"]
+
+
+
+@pytest.mark.asyncio
+async def test_persist_names_is_one_unordered_upsert_and_keeps_stored_ids():
+    stored = {**make_name("old-luna", "Luna"), "name_key": "luna|girl|latin"}
+    names = FakeNames(stored=[stored])
+    persisted = await persist_names(names, [
+        make_name("1", "Ava"),
+        make_name("2", "luna"),
+        make_name("3", "Ava "),
+        make_name("4", "Mia"),
+    ])
+    assert names.bulk_writes == [(3, False)]
+    assert [doc["id"] for doc in persisted] == ["1", "old-luna", "4"]
+    assert names.docs["mia|girl|latin"]["id"] == "4"
+
+
+@pytest.mark.asyncio
+async def test_persist_names_returns_the_winner_of_a_duplicate_key_race():
+    winner = {**make_name("other-request", "Nova"), "name_key": "nova|girl|latin"}
+    names = FakeNames(racing=[winner])
+    persisted = await persist_names(names, [make_name("1", "Nova"), make_name("2", "Iris")])
+    assert [doc["id"] for doc in persisted] == ["other-request", "2"]
+
+    class Broken(FakeNames):
+        async def bulk_write(self, ops, ordered=True):
+            raise BulkWriteError({"writeErrors": [{"index": 0, "code": 121, "errmsg": "validation"}], "upserted": []})
+
+    with pytest.raises(BulkWriteError):
+        await persist_names(Broken(), [make_name("1", "Nova")])
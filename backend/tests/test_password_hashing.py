@@ -0,0 +1,43 @@
+# Password hashing executor tests
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from password_hashing import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(max_workers=2)
+    try:
+        hashed = await hasher.hash("secret")
+        assert await hasher.verify("secret", hashed)
+        assert not await hasher.verify("wrong", hashed)
+
+        stats = hasher.stats()
+        assert stats["completed"] == 3
+        assert stats["queue_depth"] == 0
+        assert stats["workers"] == 2
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_counters_stay_consistent_under_concurrent_workers():
+    hasher = PasswordHasher(max_workers=8)
+    try:
+        await asyncio.gather(*(hasher._run(time.sleep, 0.001) for _ in range(400)))
+        stats = hasher.stats()
+        assert stats["completed"] == 400
+        assert stats["running"] == 0 and stats["queue_depth"] == 0
+        assert stats["avg_hash_ms"] >= 1.0
+    finally:
+        hasher.shutdown()
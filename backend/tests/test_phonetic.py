@@ -0,0 +1,43 @@
+# Phonetic key tests
+
+import sys
+from pathlib import Path
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from phonetic import metaphone, phonetic_keys, rank_sound_alikes, rhyme_key, soundex
+
+
+def test_soundex_reference_codes():
+    assert soundex("Robert") == soundex("Rupert") == "R163"
+    assert soundex("Ashcraft") == "A261"
+    assert soundex("Tymczak") == "T522"
+    assert soundex("Lee") == "L000"
+    assert soundex("") == ""
+
+
+def test_metaphone_and_rhyme_group_spelling_variants():
+    assert metaphone("Aiden") == metaphone("Ayden") == metaphone("Eden") == "ATN"
+    assert metaphone("Katherine") == metaphone("Catherine") == metaphone("Kathryn")
+    assert metaphone("Philip") == metaphone("Phillip") == "FLP"
+    assert metaphone("Chloe") == metaphone("Khloe")
+    assert metaphone("Knox") == "NKS"
+    assert metaphone("Henry") == "HNR"
+    assert rhyme_key("Jaden") == rhyme_key("Braden") == rhyme_key("Aiden")
+    assert rhyme_key("Mia") == ""
+    assert phonetic_keys("José") == phonetic_keys("Jose")
+    assert phonetic_keys("123") == []
+
+
+def test_ranking_prefers_shared_keys_then_popularity():
+    docs = [
+        (1, {"id": "1", "name": "Jaden", "popularity_score": 99}),
+        (3, {"id": "2", "name": "Ayden", "popularity_score": 10}),
+        (3, {"id": "3", "name": "Aidan", "popularity_score": 50}),
+        (3, {"id": "4", "name": "aidan", "popularity_score": 20}),
+        (3, {"id": "5", "name": "Aiden", "popularity_score": 90}),
+    ]
+    assert [doc["id"] for doc in rank_sound_alikes("Aiden", docs, 10)] == ["3", "2", "1"]
+    assert [doc["id"] for doc in rank_sound_alikes("Aiden", docs, 1)] == ["3"]
@@ -0,0 +1,45 @@
+# NameRecommender tests
+
+import sys
+from pathlib import Path
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from recommendations import NameRecommender
+
+
+def make_doc(name_id, name, gender="girl", origin="Latin"):
+    return {"id": name_id, "name": name, "gender": gender, "origin": origin}
+
+
+def test_recommends_similar_names_and_skips_favorites():
+    recommender = NameRecommender(initial_capacity=2)
+    recommender.add([
+        make_doc("1", "Ariana"),
+        make_doc("2", "Mariana"),
+        make_doc("3", "Brock", gender="boy", origin="English"),
+        make_doc("4", "Adriana"),
+        make_doc("5", "Ariana", origin="Italian"),
+    ])
+    assert len(recommender) == 5
+    assert recommender.add([make_doc("1", "Ariana")]) == 0
+
+    ranked = recommender.recommend([make_doc("1", "Ariana")], limit=3)
+    ids = [name_id for name_id, _ in ranked]
+    assert ids[:2] == ["2", "4"]
+    assert "1" not in ids and "5" not in ids
+    assert [score for _, score in ranked] == sorted((score for _, score in ranked), reverse=True)
+    assert recommender.recommend([], limit=3) == []
+
+
+def test_gender_filter_and_incremental_adds():
+    recommender = NameRecommender(initial_capacity=1)
+    recommender.add([make_doc("1", "Liam", gender="boy"), make_doc("2", "Lia")])
+    recommender.add([make_doc("3", "Liamon", gender="boy"), make_doc("4", "Liana")])
+    assert recommender.stats()["size"] == 4
+
+    favorites = [make_doc("1", "Liam", gender="boy")]
+    assert [name_id for name_id, _ in recommender.recommend(favorites, gender="boy")] == ["3"]
+    assert {name_id for name_id, _ in recommender.recommend(favorites, gender="girl")} == {"2", "4"}
@@ -0,0 +1,101 @@
+# Response cache tests
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from ai_agents.cache import ResponseCache, TTLCache
+from ai_agents.config import AgentConfig
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1, ttl=-1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_key_ignores_whitespace_but_not_model_or_tools():
+    key = ResponseCache.make_key("m", "sys", "hello   world\n", False)
+    assert key == ResponseCache.make_key("m", "sys", " hello world", False)
+    assert key != ResponseCache.make_key("other", "sys", "hello world", False)
+    assert key != ResponseCache.make_key("m", "sys", "hello world", True)
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_hits_and_counters():
+    cache = ResponseCache(maxsize=10, ttl=60)
+    assert await cache.get("k") is None
+
+    await cache.set("k", {"content": "hi", "metadata": {"model": "m"}})
+    value = await cache.get("k")
+    assert value == {"content": "hi", "metadata": {"model": "m"}}
+
+    # Callers get copies, so mutations do not leak into the cache
+    value["metadata"]["model"] = "changed"
+    assert (await cache.get("k"))["metadata"]["model"] == "m"
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["persistent_enabled"] is False
+
+
+@pytest.mark.asyncio
+async def test_rejected_entries_count_as_misses():
+    class FakeCollection:
+        async def find_one(self, query, projection):
+            return {"content": "Sorry, no JSON", "metadata": {}}
+
+    cache = ResponseCache(maxsize=10, ttl=60)
+    await cache.set("k", {"content": "Sorry, no JSON", "metadata": {}})
+    cache.attach_collection(FakeCollection())
+    is_json = lambda content: content.startswith("[")
+
+    assert await cache.get("k", accept=is_json) is None
+    assert len(cache.memory) == 0
+    assert await cache.get("k", accept=is_json) is None
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["persistent_hits"], stats["misses"]) == (0, 0, 2)
+
+
+@pytest.mark.asyncio
+async def test_execute_does_not_cache_replies_the_caller_rejects():
+    from ai_agents.agents import BaseAgent
+
+    replies = iter(["Sorry, here are some names: Ava", '[{"name": "Ava"}]'])
+
+    class FakeLLM:
+        async def ainvoke(self, messages):
+            return SimpleNamespace(content=next(replies))
+
+    cache = ResponseCache(maxsize=10, ttl=60)
+    agent = BaseAgent(AgentConfig("http://llm.invalid", "m", "key"), response_cache=cache, use_cache=True)
+    agent.llm = FakeLLM()
+    is_json = lambda content: content.startswith("[")
+
+    first = await agent.execute("names please", cache_if=is_json)
+    assert first.content.startswith("Sorry") and cache.stats()["stores"] == 0
+
+    # The rejected reply was not pinned, so the next call reaches the model
+    second = await agent.execute("names please", cache_if=is_json)
+    assert second.content == '[{"name": "Ava"}]' and not second.metadata.get("cached")
+    third = await agent.execute("names please", cache_if=is_json)
+    assert third.content == second.content and third.metadata["cached"]
@@ -0,0 +1,112 @@
+# LLM concurrency governor tests
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from ai_agents.scheduler import LLMScheduler, Priority, QueueFullError
+
+
+async def hold(scheduler, label, order, priority=Priority.DEFAULT, endpoint="default", agent="a"):
+    async with scheduler.slot(agent, endpoint, priority):
+        order.append(label)
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_granted_by_priority():
+    scheduler = LLMScheduler(agent_limit=1, max_queue_depth=10)
+    order = []
+    first = asyncio.create_task(hold(scheduler, "first", order))
+    await asyncio.sleep(0)
+    background = asyncio.create_task(hold(scheduler, "background", order, Priority.BACKGROUND))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(hold(scheduler, "interactive", order, Priority.INTERACTIVE))
+    await asyncio.gather(first, background, interactive)
+    assert order == ["first", "interactive", "background"]
+    assert scheduler.stats()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_endpoint_cap_does_not_block_other_endpoints():
+    scheduler = LLMScheduler(agent_limit=10, endpoint_limits={"image": 1}, max_queue_depth=10)
+    order = []
+    image = asyncio.create_task(hold(scheduler, "image-1", order, endpoint="image"))
+    await asyncio.sleep(0)
+    queued_image = asyncio.create_task(hold(scheduler, "image-2", order, endpoint="image"))
+    await asyncio.sleep(0)
+    await hold(scheduler, "names", order, endpoint="names")
+    await asyncio.gather(image, queued_image)
+    assert order.index("names") < order.index("image-2")
+
+
+@pytest.mark.asyncio
+async def test_full_queue_raises_with_retry_after():
+    scheduler = LLMScheduler(agent_limit=1, max_queue_depth=1, retry_after=3)
+    order = []
+    running = asyncio.create_task(hold(scheduler, "running", order))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(hold(scheduler, "waiting", order))
+    await asyncio.sleep(0)
+    with pytest.raises(QueueFullError) as exc_info:
+        await hold(scheduler, "rejected", order)
+    assert exc_info.value.retry_after >= 3
+    await asyncio.gather(running, waiting)
+    assert scheduler.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = LLMScheduler(agent_limit=1, max_queue_depth=5)
+    order = []
+    running = asyncio.create_task(hold(scheduler, "running", order))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(hold(scheduler, "waiting", order))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    await running
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert order == ["running"]
+    assert scheduler.stats()["queue_depth"] == 0
+    assert scheduler.stats()["in_flight_by_agent"] == {}
+
+
+@pytest.mark.asyncio
+async def test_reservations_hold_queue_places_until_used_or_released():
+    scheduler = LLMScheduler(agent_limit=1, max_queue_depth=1)
+    running = scheduler.reserve("a")
+    queued = scheduler.reserve("a")
+    assert running.future.done() and not queued.future.done()
+    # Checking and queueing are one step, so a third caller is turned away up front
+    with pytest.raises(QueueFullError):
+        scheduler.reserve("a")
+
+    scheduler.release(queued)
+    scheduler.release(queued)
+    assert scheduler.stats()["queue_depth"] == 0
+
+    order = []
+    async with scheduler.slot("a", reservation=running):
+        order.append("reserved")
+    scheduler.release(running)
+    await hold(scheduler, "next", order)
+    assert order == ["reserved", "next"]
+    assert scheduler.stats()["in_flight_by_agent"] == {}
+
+
+@pytest.mark.asyncio
+async def test_free_slot_is_reserved_even_with_no_queue():
+    scheduler = LLMScheduler(agent_limit=1, max_queue_depth=0)
+    reservation = scheduler.reserve("a")
+    assert reservation.future.done()
+    with pytest.raises(QueueFullError):
+        scheduler.reserve("a")
+    scheduler.release(reservation)
+    assert scheduler.stats()["in_flight_by_agent"] == {}
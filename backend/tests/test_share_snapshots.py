@@ -0,0 +1,47 @@
+# Shared list snapshot tests
+
+import sys
+from pathlib import Path
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from share_snapshots import ShareSnapshotCache, page_snapshot
+
+NAMES = [{"id": f"n{i}", "name": f"Name{i}", "gender": "girl"} for i in range(5)]
+
+
+def test_keyset_pages_cover_snapshot_once():
+    projection = {"_id": 0, "id": 1, "name": 1}
+    page, cursor = page_snapshot(NAMES, 2, None, projection)
+    assert page == [{"id": "n0", "name": "Name0"}, {"id": "n1", "name": "Name1"}]
+    assert cursor == "n1"
+
+    page, cursor = page_snapshot(NAMES, 2, "n3", projection)
+    assert [doc["id"] for doc in page] == ["n4"]
+    assert cursor is None
+
+    page, cursor = page_snapshot(NAMES, None, None, projection)
+    assert len(page) == 5 and cursor is None
+
+
+def test_evict_user_drops_all_of_their_tokens():
+    cache = ShareSnapshotCache(maxsize=10, ttl=60)
+    cache.set("t1", {"user_id": "u1", "version": 1, "names": []})
+    cache.set("t2", {"user_id": "u1", "version": 1, "names": []})
+    cache.set("t3", {"user_id": "u2", "version": 1, "names": []})
+    cache.evict_user("u1")
+    assert cache.get("t1") is None and cache.get("t2") is None
+    assert cache.get("t3") is not None
+
+
+def test_owner_index_is_pruned_with_evicted_and_expired_entries():
+    cache = ShareSnapshotCache(maxsize=2, ttl=60)
+    for i in range(5):
+        cache.set(f"t{i}", {"user_id": f"u{i}", "version": 1, "names": []})
+    assert set(cache._tokens_by_user) == {"u3", "u4"}
+
+    cache.cache.set("t4", {"user_id": "u4", "version": 1, "names": []}, ttl=-1)
+    assert cache.get("t4") is None
+    assert set(cache._tokens_by_user) == {"u3"}
@@ -0,0 +1,48 @@
+# Single-flight coalescing tests
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from ai_agents.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution_and_get_copies():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"names": ["Emma"]}
+
+    results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+    assert len(calls) == 1
+    assert all(result == {"names": ["Emma"]} for result in results)
+    results[0]["names"].append("Liam")
+    assert results[1] == {"names": ["Emma"]}
+    assert flight.stats() == {"leaders": 1, "followers": 4, "in_flight": 0}
+
+    # Finished work is forgotten, so the next call runs again
+    await flight.do("key", work)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flight) == 0
@@ -0,0 +1,49 @@
+# Startup import graph tests
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from ai_agents.config import AgentConfig
+from ai_agents.registry import AgentRegistry
+from benchmarks.import_time import DEFERRED_MODULES, PROBE
+
+
+class FakeAgent:
+    def __init__(self, config, http_async_client=None):
+        self.config = config
+
+    def get_capabilities(self):
+        return ["fake"]
+
+
+def test_importing_server_defers_agent_stack_and_optional_modules():
+    env = dict(os.environ, MONGO_URL="mongodb://localhost:27017", DB_NAME="import_test")
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=str(backend_dir), env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+
+    loaded = set(json.loads(result.stdout.strip().splitlines()[-1]))
+    assert "server" in loaded
+    assert not loaded & set(DEFERRED_MODULES)
+
+
+@pytest.mark.asyncio
+async def test_registry_resolves_agent_paths_on_first_use():
+    registry = AgentRegistry(AgentConfig(api_key="test"), {"fake": f"{__name__}:FakeAgent"})
+    assert registry.agent_types["fake"] == f"{__name__}:FakeAgent"
+
+    agent = await registry.get("fake")
+    assert isinstance(agent, FakeAgent)
+    assert registry.agent_types["fake"] is FakeAgent
+    assert await registry.get("fake") is agent
+    await registry.aclose()
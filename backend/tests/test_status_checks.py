@@ -0,0 +1,90 @@
+# Status check query helper tests
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+# Add backend to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from migrations import sync_status_retention
+from status_checks import (
+    MAX_SUMMARY_BUCKETS,
+    apply_cursor,
+    encode_cursor,
+    naive_utc,
+    parse_interval,
+    status_filter,
+    summary_window,
+)
+
+
+class FakeStatusChecks:
+    def __init__(self, indexes):
+        self.indexes = indexes
+
+    async def index_information(self):
+        return self.indexes
+
+    async def create_index(self, key, expireAfterSeconds=None):
+        self.indexes[f"{key}_1"] = {"key": [(key, 1)], "expireAfterSeconds": expireAfterSeconds}
+
+
+class FakeDb:
+    def __init__(self, indexes):
+        self.status_checks = FakeStatusChecks(indexes)
+        self.commands = []
+
+    async def command(self, command):
+        self.commands.append(command)
+
+
+def test_intervals_and_windows():
+    assert parse_interval("30s") == 30
+    assert parse_interval("5m") == 300
+    assert parse_interval("1d") == 86400
+    for bad in ("", "0h", "1w", "h"):
+        with pytest.raises(ValueError):
+            parse_interval(bad)
+
+    until = datetime(2024, 1, 2)
+    assert summary_window(3600, None, until) == (datetime(2024, 1, 1), until)
+    with pytest.raises(ValueError):
+        summary_window(1, until - timedelta(seconds=MAX_SUMMARY_BUCKETS + 1), until)
+    with pytest.raises(ValueError):
+        summary_window(3600, until, until)
+
+    aware = datetime(2024, 1, 1, 12, tzinfo=timezone(timedelta(hours=2)))
+    assert naive_utc(aware) == datetime(2024, 1, 1, 10)
+
+
+def test_cursor_continues_after_last_row():
+    row = {"id": "b", "timestamp": datetime(2024, 1, 1, 12, 30)}
+    query = apply_cursor(status_filter("web"), encode_cursor(row))
+    assert query == {"$and": [
+        {"client_name": "web"},
+        {"$or": [
+            {"timestamp": {"$lt": row["timestamp"]}},
+            {"timestamp": row["timestamp"], "id": {"$lt": "b"}},
+        ]},
+    ]}
+    with pytest.raises(ValueError):
+        apply_cursor({}, "not-a-date|b")
+
+
+@pytest.mark.asyncio
+async def test_retention_follows_environment(monkeypatch):
+    monkeypatch.setenv("STATUS_RETENTION_DAYS", "7")
+    db = FakeDb({})
+    assert await sync_status_retention(db) == 7 * 86400
+    assert db.status_checks.indexes["timestamp_1"]["expireAfterSeconds"] == 7 * 86400
+
+    monkeypatch.setenv("STATUS_RETENTION_DAYS", "1")
+    assert await sync_status_retention(db) == 86400
+    assert db.commands == [{
+        "collMod": "status_checks",
+        "index": {"keyPattern": {"timestamp": 1}, "expireAfterSeconds": 86400},
+    }]
@@ -11,6 +11,8 @@ import axios from 'axios';
 
 const API_BASE = process.env.REACT_APP_API_URL || 'http://localhost:8000';
 const API = `${API_BASE}/api`;
+const IMAGE_POLL_INTERVAL_MS = 2000;
+const IMAGE_POLL_MAX_ATTEMPTS = 90;
 
 const NameCard = ({ name, onToggleFavorite, isFavorite, showActions = true, onGenerateImage }) => {
   const { user } = useAuth();
@@ -301,18 +303,24 @@ const NameGenerator = ({ showFavoritesOnly = false }) => {
 
     try {
       const token = localStorage.getItem('token');
-      const response = await axios.post(`${API}/names/${nameId}/generate-image`, {}, {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      });
+      const headers = { 'Authorization': `Bearer ${token}` };
+
+      // Generation runs as a background job; poll it until it finishes, for up to 3 minutes
+      let { data: job } = await axios.post(`${API}/names/${nameId}/generate-image`, {}, { headers });
+      for (let attempt = 0; attempt < IMAGE_POLL_MAX_ATTEMPTS; attempt++) {
+        if (job.status !== 'queued' && job.status !== 'running') break;
+        await new Promise(resolve => setTimeout(resolve, IMAGE_POLL_INTERVAL_MS));
+        ({ data: job } = await axios.get(`${API}/images/jobs/${job.id}`, { headers }));
+      }
 
-      if (response.data.success) {
+      if (job.status === 'queued' || job.status === 'running') {
+        setError('Image generation is taking longer than expected. Please try again later.');
+      } else if (job.status === 'done') {
         // Update the name in the current list with the new image URL
         setNames(prevNames =>
           prevNames.map(name =>
             name.id === nameId
-              ? { ...name, image_url: response.data.image_url }
+              ? { ...name, image_url: job.image_url }
               : name
           )
         );
@@ -321,12 +329,12 @@ const NameGenerator = ({ showFavoritesOnly = false }) => {
         setFavorites(prevFavorites =>
           prevFavorites.map(fav =>
             fav.id === nameId
-              ? { ...fav, image_url: response.data.image_url }
+              ? { ...fav, image_url: job.image_url }
               : fav
           )
         );
       } else {
-        setError(`Failed to generate image: ${response.data.error}`);
+        setError(`Failed to generate image: ${job.error}`);
       }
     } catch (err) {
       console.error('Error generating image:', err);